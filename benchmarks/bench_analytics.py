@@ -0,0 +1,70 @@
+"""
+Benchmark: building the analytics cube, folding in new trades, and slicing
+it, versus regrouping the raw trades for every slice.
+
+Usage:
+    python -m benchmarks.bench_analytics [--trades 100000]
+"""
+import argparse
+import time
+
+from benchmarks.bench_trade import make_entries
+from core.analytics import TradeCube
+from core.trade import entries_to_arrow
+
+# A typical sequence of Dashboard interactions: (rows, columns, filters)
+SLICES = [
+    ("weekday", "hour", {}),
+    ("symbol", "direction", {}),
+    ("symbol", "hour", {"direction": "Long"}),
+    ("weekday", "hour", {"symbol": "TSLA"}),
+    ("direction", "weekday", {"symbol": "SPY", "direction": "Short"}),
+]
+
+
+def timed(fn, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def regroup(df, rows, columns, filters):
+    timestamps = df["entry_timestamp"]
+    frame = df.assign(weekday=timestamps.dt.weekday, hour=timestamps.dt.hour)
+    for dimension, value in filters.items():
+        frame = frame[frame[dimension] == value]
+    return frame.groupby([rows, columns], observed=True)["pnl"].sum().unstack()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trades", type=int, default=100_000)
+    parser.add_argument("--new-trades", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    table, _ = entries_to_arrow(make_entries(args.trades + args.new_trades))
+    df = table.to_pandas()
+    journal, grown = df.iloc[:args.trades], df
+
+    cube = TradeCube()
+    _, build_s = timed(lambda: cube.sync(journal))
+    _, sync_s = timed(lambda: cube.sync(grown))
+    _, slice_s = timed(lambda: [cube.pivot(r, c, "pnl", f) for r, c, f in SLICES],
+                       repeat=5)
+    _, regroup_s = timed(lambda: [regroup(df, r, c, f) for r, c, f in SLICES],
+                         repeat=5)
+
+    cells = len(cube.levels[("symbol", "direction", "weekday", "hour")])
+    print(f"Trades: {args.trades:,} (+{args.new_trades:,} new), "
+          f"base cells: {cells:,}")
+    print()
+    print(f"{'step':<34}{'seconds':>10}")
+    print(f"{'build cube':<34}{build_s:>10.4f}")
+    print(f"{'sync new trades':<34}{sync_s:>10.4f}")
+    print(f"{f'{len(SLICES)} slices from cube':<34}{slice_s:>10.4f}")
+    print(f"{f'{len(SLICES)} slices regrouping raw trades':<34}{regroup_s:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
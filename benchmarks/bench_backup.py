@@ -0,0 +1,75 @@
+"""
+Benchmark: snapshot backup and restore throughput against the in-memory
+Firestore fake, with latency injected into every backend call to mimic a
+remote backend.
+
+Usage:
+    python -m benchmarks.bench_backup [--docs 100000] [--latency-ms 20]
+    python -m benchmarks.bench_backup --docs 1000000 --workers 8 --shards 16
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from core.backup import backup_journal, restore_journal
+from core.firestore_utils import journal_collection
+from tests.fake_firestore import FakeFirestore
+
+START = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+
+def seed(db, docs):
+    journal = journal_collection(db)
+    for offset in range(0, docs, 500):
+        batch = db.batch()
+        for i in range(offset, min(offset + 500, docs)):
+            created = START + timedelta(seconds=i)
+            batch.set(journal.document(f"doc{i:08d}"), {
+                "symbol": "AAPL", "direction": "Long", "entry_price": 100.0,
+                "exit_price": 101.0, "size": 10.0, "pnl": 10.0,
+                "notes": "#breakout clean retest", "entry_timestamp": created,
+                "exit_timestamp": created + timedelta(minutes=5),
+                "created_at": created,
+            })
+        batch.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    source = FakeFirestore()
+    seed(source, args.docs)
+    source.latency = args.latency_ms / 1000
+    snapshot_dir = tempfile.mkdtemp(prefix="bench_backup_")
+    try:
+        started = time.perf_counter()
+        manifest = backup_journal(source, snapshot_dir, shards=args.shards,
+                                  workers=args.workers)
+        backup_s = time.perf_counter() - started
+
+        target = FakeFirestore(latency=args.latency_ms / 1000)
+        started = time.perf_counter()
+        restored = restore_journal(target, snapshot_dir, workers=args.workers)
+        restore_s = time.perf_counter() - started
+        size = sum(shard["count"] for shard in manifest["shards"])
+    finally:
+        shutil.rmtree(snapshot_dir)
+
+    print(f"Documents: {args.docs:,}, {args.latency_ms:.0f}ms per backend "
+          f"call, {args.shards} shards, {args.workers} workers")
+    print()
+    print(f"{'step':<10}{'docs':>12}{'seconds':>10}{'docs/s':>12}")
+    print(f"{'backup':<10}{size:>12,}{backup_s:>10.1f}{size / backup_s:>12,.0f}")
+    print(f"{'restore':<10}{restored:>12,}{restore_s:>10.1f}"
+          f"{restored / restore_s:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
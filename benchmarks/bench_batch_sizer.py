@@ -0,0 +1,106 @@
+"""
+Benchmark: batch position sizing throughput for the CLI path and the local
+HTTP service, with request latency percentiles.
+
+Usage:
+    python -m benchmarks.bench_batch_sizer [--candidates 1000000]
+        [--requests 5000] [--batch-size 10] [--clients 8]
+"""
+import argparse
+import io
+import json
+import threading
+import time
+from http.client import HTTPConnection
+
+import numpy as np
+from core.batch_sizer import make_server, size_csv
+
+
+def make_csv(n):
+    lines = ["symbol,entry_price,stop_loss_price,direction"]
+    for i in range(n):
+        entry = 10.0 + i % 500
+        if i % 2:
+            lines.append(f"S{i % 5000},{entry},{entry * 0.98:.2f},Long")
+        else:
+            lines.append(f"S{i % 5000},{entry},{entry * 1.02:.2f},Short")
+    return "\n".join(lines) + "\n"
+
+
+def bench_cli(n, chunk_size):
+    input_file = io.StringIO(make_csv(n))
+    started = time.perf_counter()
+    size_csv(input_file, io.StringIO(), account_balance=25000,
+             risk_percentage=1, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"CLI: {n:,} candidates in {elapsed:.2f}s "
+          f"({n / elapsed:,.0f} candidates/s, chunk size {chunk_size:,})")
+
+
+def bench_http(total_requests, batch_size, clients):
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    body = json.dumps({
+        "account_balance": 25000,
+        "risk_percentage": 1,
+        "candidates": [
+            {"symbol": f"S{i}", "entry_price": 100 + i,
+             "stop_loss_price": 98 + i, "direction": "Long"}
+            for i in range(batch_size)
+        ],
+    }).encode("utf-8")
+    per_client = total_requests // clients
+    latencies = [[] for _ in range(clients)]
+
+    def run_client(samples):
+        # Each client reuses one keep-alive connection, as a scanner would
+        conn = HTTPConnection(*server.server_address, timeout=10)
+        headers = {"Content-Type": "application/json"}
+        for _ in range(per_client):
+            started = time.perf_counter()
+            conn.request("POST", "/size", body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            samples.append(time.perf_counter() - started)
+        conn.close()
+
+    threads = [threading.Thread(target=run_client, args=(samples,))
+               for samples in latencies]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    server.server_close()
+
+    samples = np.array([s for client in latencies for s in client]) * 1000
+    count = len(samples)
+    print(f"HTTP: {count:,} requests x {batch_size} candidates, "
+          f"{clients} clients in {elapsed:.2f}s")
+    print(f"  throughput: {count / elapsed:,.0f} requests/s "
+          f"({count * batch_size / elapsed:,.0f} candidates/s)")
+    print(f"  latency: p50 {np.percentile(samples, 50):.2f}ms, "
+          f"p99 {np.percentile(samples, 99):.2f}ms, "
+          f"max {samples.max():.2f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    bench_cli(args.candidates, args.chunk_size)
+    bench_http(args.requests, args.batch_size, args.clients)
+
+
+if __name__ == "__main__":
+    main()
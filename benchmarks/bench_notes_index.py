@@ -0,0 +1,60 @@
+"""
+Benchmark: building the notes index and searching it, versus scanning every
+entry's notes for each query.
+
+Usage:
+    python -m benchmarks.bench_notes_index [--entries 50000]
+"""
+import argparse
+import time
+
+from core.notes_index import NotesIndex, extract_tags
+
+SYMBOLS = ["TSLA", "AAPL", "MSFT", "NVDA"]
+TAGS = ["#fomo", "#breakout", "#revenge", "#pullback", "#news"]
+QUERIES = ["#fomo on TSLA", "#breakout", "VWAP", "$NVDA number", "#news 4244"]
+
+
+def make_entries(n):
+    return [{
+        "id": f"t{i}",
+        "symbol": SYMBOLS[i % len(SYMBOLS)],
+        "notes": f"{TAGS[i % len(TAGS)]} setup number {i}"
+                 + (" over VWAP" if i % 11 == 0 else ""),
+    } for i in range(n)]
+
+
+def scan(entries, tag, symbol):
+    return {e["id"] for e in entries
+            if e["symbol"] == symbol and tag in extract_tags(e["notes"])}
+
+
+def timed(fn, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    entries = make_entries(args.entries)
+    index = NotesIndex()
+    _, build_s = timed(lambda: index.sync(entries))
+
+    print(f"Entries: {args.entries:,}, index built in {build_s:.3f}s")
+    print()
+    print(f"{'query':<20}{'matches':>10}{'ms':>10}")
+    for query in QUERIES:
+        result, search_s = timed(lambda: index.search(query), args.repeat)
+        print(f"{query:<20}{len(result):>10,}{search_s * 1000:>10.2f}")
+    result, scan_s = timed(lambda: scan(entries, "fomo", "TSLA"))
+    print(f"{'scan: #fomo TSLA':<20}{len(result):>10,}{scan_s * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
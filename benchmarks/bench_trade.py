@@ -0,0 +1,154 @@
+"""
+Benchmark: memory per trade and DataFrame conversion cost for journal entry
+dicts versus the Trade model and its bulk (structured array / Arrow) forms,
+and the full read -> DataFrame path the Dashboard runs, against the
+in-memory Firestore fake.
+
+Usage:
+    python -m benchmarks.bench_trade [--trades 100000]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from core.firestore_utils import get_trade_entries, get_trade_table
+from core.trade import (
+    Trade,
+    entries_to_arrow,
+    trades_from_entries,
+    trades_to_arrow,
+    trades_to_records
+)
+from tests.fake_firestore import FakeFirestore
+
+SYMBOLS = ["AAPL", "MSFT", "TSLA", "NVDA", "AMZN", "META", "SPY", "QQQ"]
+START = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+
+def make_entries(n):
+    entries = []
+    for i in range(n):
+        entry_ts = START + timedelta(minutes=i)
+        entry_price = 100.0 + (i % 50)
+        exit_price = entry_price + ((i % 7) - 3)
+        entries.append({
+            "id": f"doc{i:08d}",
+            "symbol": SYMBOLS[i % len(SYMBOLS)],
+            "direction": "Long" if i % 3 else "Short",
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "size": float(1 + i % 100),
+            "pnl": (exit_price - entry_price) * (1 + i % 100),
+            "notes": "",
+            "entry_timestamp": entry_ts,
+            "exit_timestamp": entry_ts + timedelta(minutes=30),
+        })
+    return entries
+
+
+def held_bytes(build):
+    """
+    Returns the Python heap bytes still held by the result of build(),
+    including everything it references that was allocated while building.
+    """
+    tracemalloc.start()
+    result = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held
+
+
+def peak_bytes(build):
+    """
+    Returns the peak Python heap bytes allocated while running build().
+    """
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def seed(entries):
+    db = FakeFirestore()
+    journal = db.collection("journal_entries")
+    for offset in range(0, len(entries), 500):
+        batch = db.batch()
+        for entry in entries[offset:offset + 500]:
+            data = dict(entry, created_at=entry["entry_timestamp"])
+            batch.set(journal.document(data.pop("id")), data)
+        batch.commit()
+    return db
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trades", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    n = args.trades
+
+    dict_bytes = held_bytes(lambda: make_entries(n))
+    trade_bytes = held_bytes(
+        lambda: [Trade.from_dict(e) for e in make_entries(n)])
+
+    entries = make_entries(n)
+    trades, from_dict_s = timed(lambda: [Trade.from_dict(e) for e in entries])
+    records, records_s = timed(lambda: trades_to_records(trades))
+    table, arrow_s = timed(lambda: trades_to_arrow(trades))
+
+    _, dict_frame_s = timed(lambda: pd.DataFrame(entries))
+    _, arrow_frame_s = timed(lambda: table.to_pandas())
+    _, records_frame_s = timed(lambda: pd.DataFrame(records))
+
+    print(f"Trades: {n:,}")
+    print()
+    print(f"{'form':<22}{'bytes/trade':>12}{'build (s)':>12}")
+    print(f"{'dict entries':<22}{dict_bytes / n:>12.0f}{'-':>12}")
+    print(f"{'Trade (__slots__)':<22}{trade_bytes / n:>12.0f}{from_dict_s:>12.3f}")
+    print(f"{'structured array':<22}{records.nbytes / n:>12.0f}{records_s:>12.3f}")
+    print(f"{'Arrow table':<22}{table.nbytes / n:>12.0f}{arrow_s:>12.3f}")
+    print()
+    print(f"{'DataFrame from':<22}{'seconds':>12}")
+    print(f"{'dict entries':<22}{dict_frame_s:>12.3f}")
+    print(f"{'structured array':<22}{records_frame_s:>12.3f}")
+    print(f"{'Arrow table':<22}{arrow_frame_s:>12.3f}")
+
+    _, validated_s = timed(lambda: entries_to_arrow(entries)[0].to_pandas())
+    _, via_trades_s = timed(lambda: trades_to_arrow(
+        trades_from_entries(entries)[0]).to_pandas())
+    print()
+    print(f"{'entries -> DataFrame':<34}{'seconds':>10}")
+    print(f"{'pd.DataFrame (no validation)':<34}{dict_frame_s:>10.3f}")
+    print(f"{'Trade -> Arrow -> pandas':<34}{via_trades_s:>10.3f}")
+    print(f"{'entries_to_arrow -> pandas':<34}{validated_s:>10.3f}")
+
+    # The whole Dashboard path, from the backend to the DataFrame
+    db = seed(entries)
+
+    def read_dicts():
+        return pd.DataFrame(get_trade_entries(db))
+
+    def read_table():
+        return get_trade_table(db)[0].to_pandas()
+
+    print()
+    print(f"{'read -> DataFrame':<34}{'seconds':>10}{'peak MiB':>10}")
+    for label, read in (("get_trade_entries + pd.DataFrame", read_dicts),
+                        ("get_trade_table + to_pandas", read_table)):
+        read()  # Warm up the fake's sorted query cache
+        _, read_s = timed(read)
+        peak = peak_bytes(read) / 2**20
+        print(f"{label:<34}{read_s:>10.3f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
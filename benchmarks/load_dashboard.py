@@ -0,0 +1,275 @@
+"""
+Load test: many sessions rendering a Streamlit page against an in-memory
+Firestore fake with injected backend latency.
+
+Sessions are driven through Streamlit's AppTest. AppTest shares one
+Streamlit runtime per process and cannot run scripts from several threads,
+so concurrency comes from worker processes only: at most --workers renders
+run at a time. Each worker renders its share of the sessions one after
+another against its own fake backend (seeded with the same journal), its
+own circuit breaker and its own caches, so the workers do not contend for
+shared state the way sessions of one server process do.
+
+Reports render latency percentiles, throughput, backend calls per render
+and memory per session. With --baseline the run becomes a regression gate:
+it exits with status 1 when a metric is worse than the baseline by more
+than --tolerance, or when any render raised.
+
+Usage:
+    python -m benchmarks.load_dashboard --sessions 16 --workers 4 \
+        --renders 5 --trades 2000 --latency-ms 20
+    python -m benchmarks.load_dashboard --save-baseline load_baseline.json
+    python -m benchmarks.load_dashboard --baseline load_baseline.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PAGE = os.path.join("pages", "3_Dashboard.py")
+
+# Metrics compared against a baseline; for all of them lower is better
+GATED_METRICS = (
+    "p50_ms", "p95_ms", "p99_ms", "calls_per_render", "memory_per_session_kib"
+)
+
+
+def seed_backend(trades, latency):
+    """
+    Returns a fake Firestore backend holding `trades` journal entries, with
+    `latency` seconds added to every backend call made afterwards.
+    """
+    from core.firestore_utils import journal_collection
+    from tests.fake_firestore import FakeFirestore
+
+    db = FakeFirestore()
+    journal = journal_collection(db)
+    symbols = ["AAPL", "MSFT", "TSLA", "NVDA", "SPY"]
+    start = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+    for i in range(trades):
+        entry_ts = start + timedelta(hours=i)
+        journal.add({
+            "symbol": symbols[i % len(symbols)],
+            "direction": "Long" if i % 3 else "Short",
+            "entry_price": 100.0,
+            "exit_price": 100.0 + (i % 7) - 3,
+            "size": 10.0,
+            "pnl": ((i % 7) - 3) * 10.0 * (1 if i % 3 else -1),
+            "notes": "#fomo chased" if i % 4 == 0 else "#breakout",
+            "entry_timestamp": entry_ts,
+            "exit_timestamp": entry_ts + timedelta(minutes=30),
+            "created_at": entry_ts + timedelta(minutes=31),
+        })
+    db.latency = latency
+    db.calls.clear()
+    return db
+
+
+def new_session(page_path, db):
+    from streamlit.testing.v1 import AppTest
+
+    session = AppTest.from_file(page_path, default_timeout=120)
+    session.session_state["firestore_client"] = db
+    return session
+
+
+def _prepare_worker():
+    # Pages import 'core' from the repository root and write local files
+    # (e.g. the notes index) relative to the working directory
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    os.chdir(tempfile.mkdtemp(prefix="load_dashboard_"))
+
+
+def run_worker(task):
+    """
+    Renders `sessions` sessions `renders` times each, round-robin, after
+    one untimed warm-up render.
+    Returns latencies (seconds), backend calls by operation, render count,
+    error messages and the seconds spent in the render loop (excluding
+    process start-up, seeding and the warm-up).
+    """
+    page_path, sessions, renders, trades, latency = task
+    _prepare_worker()
+    db = seed_backend(trades, latency)
+    # Warm up imports and caches so the first timed render isn't a cold start
+    new_session(page_path, db).run()
+    db.calls.clear()
+    apps = [new_session(page_path, db) for _ in range(sessions)]
+
+    latencies, errors = [], []
+    loop_started = time.perf_counter()
+    for _ in range(renders):
+        for app in apps:
+            started = time.perf_counter()
+            app.run()
+            latencies.append(time.perf_counter() - started)
+            errors.extend(str(e.value) for e in app.exception)
+    loop_elapsed = time.perf_counter() - loop_started
+    return latencies, dict(db.calls), len(latencies), errors, loop_elapsed
+
+
+def measure_session_memory(page_path, trades, sessions=3):
+    """
+    Returns the Python heap bytes held per rendered session, measured with
+    tracemalloc in this process while the sessions are kept alive.
+    """
+    _prepare_worker()
+    db = seed_backend(trades, 0.0)
+    new_session(page_path, db).run()  # Warm up imports and caches
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    apps = []
+    for _ in range(sessions):
+        app = new_session(page_path, db)
+        app.run()
+        apps.append(app)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (held - baseline) / sessions
+
+
+def run_load(page=DEFAULT_PAGE, sessions=8, workers=4, renders=3,
+             trades=1000, latency_ms=20.0, memory_sessions=3):
+    """
+    Runs the load test and returns a report dictionary.
+    """
+    page_path = os.path.join(REPO_ROOT, page)
+    workers = max(1, min(workers, sessions))
+    shares = [sessions // workers + (i < sessions % workers)
+              for i in range(workers)]
+    tasks = [(page_path, share, renders, trades, latency_ms / 1000)
+             for share in shares]
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        results = pool.map(run_worker, tasks)
+
+    with context.Pool(1) as pool:
+        memory = pool.apply(measure_session_memory,
+                            (page_path, trades, memory_sessions))
+
+    latencies = np.array([s for result in results for s in result[0]]) * 1000
+    calls = Counter()
+    for result in results:
+        calls.update(result[1])
+    total_renders = sum(result[2] for result in results)
+    errors = [e for result in results for e in result[3]]
+    # Workers render in parallel, so their render loop rates add up
+    renders_per_second = sum(result[2] / result[4] for result in results)
+
+    return {
+        "page": page,
+        "sessions": sessions,
+        "workers": workers,
+        "concurrent_renders": workers,
+        "renders": total_renders,
+        "trades": trades,
+        "latency_ms": latency_ms,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+        "renders_per_second": renders_per_second,
+        "calls_per_render": sum(calls.values()) / total_renders,
+        "calls_by_operation": {
+            op: count / total_renders for op, count in sorted(calls.items())
+        },
+        "memory_per_session_kib": memory / 1024,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """
+    Returns a list of messages for metrics that regressed by more than
+    `tolerance` (a fraction, e.g. 0.2 for 20%) against the baseline report.
+    """
+    failures = []
+    for metric in GATED_METRICS:
+        if metric not in baseline:
+            continue
+        limit = baseline[metric] * (1 + tolerance)
+        if report[metric] > limit:
+            failures.append(
+                f"{metric}: {report[metric]:.2f} > {limit:.2f} "
+                f"(baseline {baseline[metric]:.2f} + {tolerance:.0%})")
+    if report["errors"]:
+        failures.append(f"{report['errors']} renders raised, first: "
+                        f"{report['first_error']}")
+    return failures
+
+
+def print_report(report):
+    print(f"{report['page']}: {report['sessions']} sessions, "
+          f"{report['concurrent_renders']} concurrent renders (one per worker "
+          f"process), {report['renders']} renders, "
+          f"{report['trades']} trades, {report['latency_ms']:.0f}ms backend "
+          f"latency")
+    print(f"  render latency: p50 {report['p50_ms']:.1f}ms, "
+          f"p95 {report['p95_ms']:.1f}ms, p99 {report['p99_ms']:.1f}ms, "
+          f"max {report['max_ms']:.1f}ms")
+    print(f"  throughput: {report['renders_per_second']:.1f} renders/s")
+    calls = ", ".join(f"{op} {n:.2f}"
+                      for op, n in report["calls_by_operation"].items())
+    print(f"  backend calls per render: {report['calls_per_render']:.2f} "
+          f"({calls})")
+    print(f"  memory per session: {report['memory_per_session_kib']:.0f} KiB")
+    print(f"  errors: {report['errors']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--page", default=DEFAULT_PAGE,
+                        help="Page script, relative to the repository root.")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--renders", type=int, default=3,
+                        help="Renders per session.")
+    parser.add_argument("--trades", type=int, default=1000,
+                        help="Journal entries in the fake backend.")
+    parser.add_argument("--latency-ms", type=float, default=20.0,
+                        help="Latency injected into every backend call.")
+    parser.add_argument("--output", help="Write the report as JSON.")
+    parser.add_argument("--baseline", help="Fail on regression against this "
+                                           "JSON report.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed regression as a fraction (default 0.2).")
+    parser.add_argument("--save-baseline",
+                        help="Write the report as the new baseline.")
+    args = parser.parse_args(argv)
+
+    report = run_load(args.page, args.sessions, args.workers, args.renders,
+                      args.trades, args.latency_ms)
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    failures = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = compare_to_baseline(report, json.load(f), args.tolerance)
+    elif report["errors"]:
+        failures = compare_to_baseline(report, {}, args.tolerance)
+    if failures:
+        print("REGRESSION:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Where is the edge? P&L, win rate, expectancy and trade count over every
+combination of symbol, direction, weekday and hour of entry.
+
+Trades are aggregated once into base cells (one per symbol × direction ×
+weekday × hour) holding only additive measures, and every roll-up level
+(each subset of the dimensions, down to the grand total) is precomputed from
+them. Derived metrics are computed from the additive measures when a level
+is read, so new trades are folded in by adding their cells to every level
+instead of regrouping the whole journal.
+"""
+import threading
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DIMENSIONS = ("symbol", "direction", "weekday", "hour")
+MEASURES = ("count", "wins", "pnl", "gross_win", "gross_loss")
+METRICS = ("pnl", "win_rate", "expectancy", "count")
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# Weekday/hour code for trades without an entry or created timestamp
+UNKNOWN = -1
+
+
+def trade_cells(df, tz="UTC"):
+    """
+    Aggregates trades into base cells in one vectorized pass.
+    Args:
+        df (pd.DataFrame): Trades with symbol, direction, pnl and
+                           entry_timestamp (tz-aware) columns, e.g. from
+                           entries_to_arrow(...)[0].to_pandas(). created_at
+                           is used when entry_timestamp is missing.
+        tz (str): Time zone for the weekday and hour dimensions.
+    Returns:
+        pd.DataFrame: MEASURES columns, indexed by DIMENSIONS.
+    """
+    timestamps = pd.to_datetime(df["entry_timestamp"], utc=True)
+    if "created_at" in df.columns:
+        timestamps = timestamps.fillna(pd.to_datetime(df["created_at"], utc=True))
+    timestamps = timestamps.dt.tz_convert(tz)
+    pnl = df["pnl"].to_numpy(dtype="f8")
+    wins = pnl > 0
+
+    cells = pd.DataFrame({
+        "symbol": df["symbol"].astype(str).to_numpy(),
+        "direction": df["direction"].astype(str).to_numpy(),
+        "weekday": timestamps.dt.weekday.fillna(UNKNOWN).to_numpy(dtype="i8"),
+        "hour": timestamps.dt.hour.fillna(UNKNOWN).to_numpy(dtype="i8"),
+        "count": np.ones(len(pnl), dtype="i8"),
+        "wins": wins.astype("i8"),
+        "pnl": pnl,
+        "gross_win": np.where(wins, pnl, 0.0),
+        "gross_loss": np.where(pnl < 0, pnl, 0.0),
+    })
+    return cells.groupby(list(DIMENSIONS), sort=False).sum()
+
+
+def add_metrics(cells):
+    """
+    Returns a copy of aggregated cells with the derived metrics added:
+    win_rate (percent of trades with positive P&L) and expectancy (average
+    P&L per trade).
+    """
+    result = cells.copy()
+    # Counts turn into floats when levels are aligned and added
+    result[["count", "wins"]] = result[["count", "wins"]].astype("i8")
+    count = result["count"].where(result["count"] > 0)
+    result["win_rate"] = result["wins"] / count * 100
+    result["expectancy"] = result["pnl"] / count
+    return result
+
+
+def dimension_labels(dimension, values):
+    """
+    Returns display labels for dimension values: weekday names and zero-padded
+    hours, with 'n/a' for trades without a timestamp.
+    """
+    if dimension == "weekday":
+        return [WEEKDAYS[v] if v != UNKNOWN else "n/a" for v in values]
+    if dimension == "hour":
+        return [f"{v:02d}:00" if v != UNKNOWN else "n/a" for v in values]
+    return [str(v) for v in values]
+
+
+def _level_key(dimensions):
+    unknown = set(dimensions) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(sorted(unknown))}. "
+                         f"Choose from {', '.join(DIMENSIONS)}.")
+    return tuple(d for d in DIMENSIONS if d in dimensions)
+
+
+def _rollup(cells, dimensions):
+    if not dimensions:
+        return cells.sum().to_frame().T
+    return cells.groupby(level=list(dimensions), sort=True).sum()
+
+
+class TradeCube:
+    """
+    Analytics cube over DIMENSIONS with every roll-up level precomputed.
+    Tracks which trade IDs it contains, so it can be kept in sync with a
+    growing journal by adding only the new trades. A cube is shared by all
+    sessions (see get_trade_cube), so reads and updates take the cube's lock.
+    """
+
+    def __init__(self, tz="UTC"):
+        self.tz = tz
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """
+        Removes all trades from the cube.
+        """
+        empty = pd.DataFrame(
+            {m: pd.Series(dtype="f8") for m in MEASURES},
+            index=pd.MultiIndex.from_tuples([], names=list(DIMENSIONS)))
+        with self._lock:
+            self.trade_ids = set()
+            self.levels = {
+                dims: _rollup(empty, dims)
+                for r in range(len(DIMENSIONS) + 1)
+                for dims in combinations(DIMENSIONS, r)
+            }
+
+    def __len__(self):
+        return len(self.trade_ids)
+
+    def add(self, df):
+        """
+        Folds trades (see trade_cells) into every roll-up level. Trades whose
+        'id' is already in the cube are skipped. Returns the number of trades
+        added.
+        """
+        with self._lock:
+            if "id" in df.columns:
+                df = df[~self._known(df)]
+            return self._add_new(df)
+
+    def _known(self, df):
+        # Set lookups per ID; Series.isin would hash the whole set every call
+        return np.fromiter((i in self.trade_ids for i in df["id"]), dtype=bool,
+                           count=len(df))
+
+    def _add_new(self, df):
+        if df.empty:
+            return 0
+        if "id" in df.columns:
+            self.trade_ids.update(df["id"])
+        cells = trade_cells(df, self.tz)
+        for dims, level in self.levels.items():
+            self.levels[dims] = level.add(_rollup(cells, dims), fill_value=0)
+        return len(df)
+
+    def sync(self, df):
+        """
+        Brings the cube in line with the journal's trades: new trades are
+        added incrementally, and the cube is rebuilt if trades it contains
+        are no longer in the journal. Returns the number of trades added.
+        """
+        with self._lock:
+            known = self._known(df)
+            if known.sum() < len(self.trade_ids):
+                self.clear()
+                return self._add_new(df)
+            return self._add_new(df[~known])
+
+    def rollup(self, dimensions=(), filters=None):
+        """
+        Returns measures and metrics grouped by the given dimensions.
+        Args:
+            dimensions (iterable): Dimensions to group by; empty for the
+                                   grand total.
+            filters (dict, optional): Dimension -> value to slice on, e.g.
+                                      {"direction": "Long"}.
+        Returns:
+            pd.DataFrame: MEASURES and METRICS columns, indexed by the
+                          dimensions.
+        """
+        filters = filters or {}
+        dims = _level_key(dimensions)
+        with self._lock:
+            level = self.levels[_level_key(set(dims) | set(filters))]
+        if filters:
+            mask = np.ones(len(level), dtype=bool)
+            for dimension, value in filters.items():
+                mask &= level.index.get_level_values(dimension) == value
+            level = _rollup(level[mask], dims)
+        return add_metrics(level)
+
+    def pivot(self, rows, columns, metric="pnl", filters=None):
+        """
+        Returns a rows × columns table of one metric, with display labels.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. "
+                             f"Choose from {', '.join(METRICS)}.")
+        if rows == columns:
+            raise ValueError("Rows and columns must be different dimensions.")
+        table = self.rollup((rows, columns), filters)[metric].unstack(columns)
+        table.index = dimension_labels(rows, table.index)
+        table.columns = dimension_labels(columns, table.columns)
+        table.index.name, table.columns.name = rows, columns
+        return table
+
+
+@st.cache_resource
+def get_trade_cube(account_id=None, tz="UTC"):
+    """
+    Returns the analytics cube for an account and time zone, shared by all
+    sessions of this process; an empty cube is created the first time it is
+    needed.
+    """
+    return TradeCube(tz)
@@ -0,0 +1,391 @@
+"""
+Local snapshot backup and restore of the trade journal, without the cloud
+import/export tooling.
+
+A backup splits the journal's 'created_at' range into disjoint shards and
+reads them in parallel, writing each shard as gzip-compressed NDJSON (one
+{"id": ..., "data": ...} document per line). A manifest listing every shard
+with its time range, document count and SHA-256 checksum is written last, so
+a snapshot without a manifest is incomplete. Entries without 'created_at'
+are not covered by the range queries and are not backed up (every entry
+added through the app has one).
+
+A restore verifies the checksums, then writes the documents back with their
+original IDs in batched writes, a bounded number of shards at a time.
+Progress is recorded in the snapshot directory after every batch; because
+writes are idempotent sets, an interrupted restore is resumed by running it
+again.
+
+Usage:
+    python -m core.backup backup --output snapshots/2024-07-01
+    python -m core.backup backup --output snapshots/funded --account funded-50k
+    python -m core.backup verify --input snapshots/2024-07-01
+    python -m core.backup restore --input snapshots/2024-07-01
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from google.cloud import firestore
+
+from core.firestore_utils import (
+    READ_DEADLINE,
+    WRITE_DEADLINE,
+    connect_firestore,
+    create_account,
+    journal_collection
+)
+from core.resilience import call_with_resilience
+
+MANIFEST_NAME = "manifest.json"
+PROGRESS_NAME = "restore_progress.json"
+SNAPSHOT_VERSION = 1
+
+# Firestore allows at most 500 writes per batch
+RESTORE_BATCH_SIZE = 400
+
+# zlib's default level; gzip's default (9) is much slower for little gain
+COMPRESS_LEVEL = 6
+
+# Tag for datetime values, which JSON has no type for
+_DATETIME_KEY = "$datetime"
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {_DATETIME_KEY: value.isoformat()}
+    raise TypeError(f"Cannot back up value of type {type(value).__name__}.")
+
+
+_encoder = json.JSONEncoder(default=_encode_value, ensure_ascii=False,
+                            separators=(",", ":"))
+
+
+def _decode_object(obj):
+    if len(obj) == 1 and _DATETIME_KEY in obj:
+        return datetime.fromisoformat(obj[_DATETIME_KEY])
+    return obj
+
+
+def _write_json_atomic(path, data):
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def file_sha256(path):
+    """
+    Returns the hex SHA-256 digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _edge_document(collection, direction):
+    query = collection.order_by("created_at", direction=direction).limit(1)
+    docs = call_with_resilience(
+        lambda timeout: list(query.stream(timeout=timeout, retry=None)),
+        deadline=READ_DEADLINE)
+    return docs[0] if docs else None
+
+
+def shard_ranges(first, last, shards):
+    """
+    Splits the 'created_at' range [first, last] into up to `shards` disjoint,
+    half-open [start, end) ranges that together cover it.
+    """
+    if first == last:
+        shards = 1
+    step = (last - first) / shards
+    bounds = [first + step * i for i in range(shards)]
+    bounds.append(last + timedelta(microseconds=1))
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _backup_shard(collection, start, end, path, page_size):
+    query = collection \
+        .where(filter=firestore.FieldFilter("created_at", ">=", start)) \
+        .where(filter=firestore.FieldFilter("created_at", "<", end)) \
+        .order_by("created_at")
+    count = 0
+    last_doc = None
+    with gzip.open(path, "wt", encoding="utf-8",
+                   compresslevel=COMPRESS_LEVEL) as f:
+        while True:
+            page_query = query.limit(page_size)
+            if last_doc is not None:
+                page_query = page_query.start_after(last_doc)
+            docs = call_with_resilience(
+                lambda timeout: list(page_query.stream(timeout=timeout,
+                                                       retry=None)),
+                deadline=READ_DEADLINE)
+            f.writelines(
+                _encoder.encode({"id": doc.id, "data": doc.to_dict()}) + "\n"
+                for doc in docs)
+            count += len(docs)
+            if len(docs) < page_size:
+                break
+            last_doc = docs[-1]
+    return count, file_sha256(path)
+
+
+def backup_journal(db, output_dir, account_id=None, shards=8, workers=4,
+                   page_size=1000):
+    """
+    Writes a snapshot of a journal to a local directory.
+    Args:
+        db: Firestore client instance.
+        output_dir (str): Directory for the snapshot; created if missing. Must
+                          not already contain a snapshot.
+        account_id (str, optional): Account to back up. Defaults to None
+                                    (the unpartitioned journal).
+        shards (int): Number of 'created_at' ranges read in parallel.
+        workers (int): Maximum number of shards read at the same time.
+        page_size (int): Documents fetched per query.
+    Returns:
+        dict: The snapshot manifest.
+    """
+    if shards <= 0 or workers <= 0 or page_size <= 0:
+        raise ValueError("Shards, workers and page size must be positive.")
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        raise ValueError(f"{output_dir} already contains a snapshot.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    collection = journal_collection(db, account_id)
+    first = _edge_document(collection, firestore.Query.ASCENDING)
+    last = _edge_document(collection, firestore.Query.DESCENDING)
+    ranges = []
+    if first is not None:
+        ranges = shard_ranges(first.get("created_at"), last.get("created_at"),
+                              shards)
+
+    files = [f"shard-{i:04d}.ndjson.gz" for i in range(len(ranges))]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda args: _backup_shard(collection, *args, page_size),
+            [(start, end, os.path.join(output_dir, name))
+             for (start, end), name in zip(ranges, files)]))
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "account_id": account_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "count": sum(count for count, _ in results),
+        "shards": [
+            {"file": name, "start": start.isoformat(), "end": end.isoformat(),
+             "count": count, "sha256": sha256}
+            for name, (start, end), (count, sha256) in zip(files, ranges, results)
+        ],
+    }
+    _write_json_atomic(manifest_path, manifest)
+    return manifest
+
+
+def load_manifest(snapshot_dir):
+    """
+    Reads a snapshot's manifest.
+    Raises:
+        ValueError: If the directory has no manifest (no or incomplete
+                    snapshot) or the snapshot version is not supported.
+    """
+    path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise ValueError(f"No complete snapshot in {snapshot_dir} "
+                         f"({MANIFEST_NAME} is missing).")
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: "
+                         f"{manifest.get('version')}.")
+    return manifest
+
+
+def verify_snapshot(snapshot_dir):
+    """
+    Checks every shard file against the manifest's checksum.
+    Returns:
+        dict: The snapshot manifest.
+    Raises:
+        ValueError: If a shard is missing or its checksum does not match.
+    """
+    manifest = load_manifest(snapshot_dir)
+    for shard in manifest["shards"]:
+        path = os.path.join(snapshot_dir, shard["file"])
+        if not os.path.exists(path):
+            raise ValueError(f"Shard {shard['file']} is missing.")
+        if file_sha256(path) != shard["sha256"]:
+            raise ValueError(f"Shard {shard['file']} is corrupt "
+                             f"(checksum mismatch).")
+    return manifest
+
+
+def iter_snapshot_documents(path):
+    """
+    Yields (document ID, data) pairs from a shard file, with datetimes
+    restored.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line, object_hook=_decode_object)
+            yield record["id"], record["data"]
+
+
+class _RestoreProgress:
+    """
+    Documents restored per shard for one target collection, saved in the
+    snapshot directory after every batch.
+    """
+
+    def __init__(self, path, target, restart=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {"targets": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._data = json.load(f)
+        if restart:
+            self._data["targets"].pop(target, None)
+        self.done = self._data["targets"].setdefault(target, {})
+
+    def update(self, shard_file, count):
+        with self._lock:
+            self.done[shard_file] = count
+            _write_json_atomic(self.path, self._data)
+
+
+def _restore_shard(db, collection, path, shard, progress, batch_size):
+    done = progress.done.get(shard["file"], 0)
+    if done >= shard["count"]:
+        return 0
+
+    def commit(batch, restored):
+        call_with_resilience(
+            lambda timeout: batch.commit(timeout=timeout, retry=None),
+            deadline=WRITE_DEADLINE)
+        progress.update(shard["file"], restored)
+
+    restored = done
+    batch, pending = db.batch(), 0
+    for position, (doc_id, data) in enumerate(iter_snapshot_documents(path)):
+        if position < done:
+            continue
+        batch.set(collection.document(doc_id), data)
+        pending += 1
+        if pending == batch_size:
+            restored += pending
+            commit(batch, restored)
+            batch, pending = db.batch(), 0
+    if pending:
+        restored += pending
+        commit(batch, restored)
+    return restored - done
+
+
+def restore_journal(db, snapshot_dir, account_id=None, workers=4,
+                    batch_size=RESTORE_BATCH_SIZE, restart=False):
+    """
+    Writes a snapshot back to Firestore, keeping the original document IDs.
+    Run it again after an interruption to resume where it stopped.
+    Args:
+        db: Firestore client instance.
+        snapshot_dir (str): Directory written by backup_journal.
+        account_id (str, optional): Account to restore into. Defaults to the
+                                    account the snapshot was taken from.
+        workers (int): Maximum number of shards restored at the same time.
+        batch_size (int): Documents per batched write (at most 500).
+        restart (bool): Ignore the recorded progress and write every
+                        document again, e.g. to restore the same snapshot a
+                        second time.
+    Returns:
+        int: Number of documents written by this run.
+    """
+    if workers <= 0 or not 0 < batch_size <= 500:
+        raise ValueError("Workers must be positive and the batch size between "
+                         "1 and 500.")
+    manifest = verify_snapshot(snapshot_dir)
+    if account_id is None:
+        account_id = manifest["account_id"]
+    if account_id is not None:
+        create_account(db, account_id)
+    collection = journal_collection(db, account_id)
+    progress = _RestoreProgress(os.path.join(snapshot_dir, PROGRESS_NAME),
+                                account_id or "", restart=restart)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        restored = pool.map(
+            lambda shard: _restore_shard(
+                db, collection, os.path.join(snapshot_dir, shard["file"]), shard,
+                progress, batch_size),
+            manifest["shards"])
+        return sum(restored)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Back up and restore the trade journal locally.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backup_parser = subparsers.add_parser(
+        "backup", help="Write a snapshot of the journal.")
+    backup_parser.add_argument("--output", required=True,
+                               help="Snapshot directory.")
+    backup_parser.add_argument(
+        "--account", help="Account to back up (default: unpartitioned journal).")
+    backup_parser.add_argument("--shards", type=int, default=8)
+    backup_parser.add_argument("--workers", type=int, default=4)
+    backup_parser.add_argument("--page-size", type=int, default=1000)
+
+    verify_parser = subparsers.add_parser(
+        "verify", help="Check a snapshot's checksums.")
+    verify_parser.add_argument("--input", required=True,
+                               help="Snapshot directory.")
+
+    restore_parser = subparsers.add_parser(
+        "restore", help="Write a snapshot back to Firestore.")
+    restore_parser.add_argument("--input", required=True,
+                                help="Snapshot directory.")
+    restore_parser.add_argument(
+        "--account", help="Account to restore into (default: the snapshot's).")
+    restore_parser.add_argument("--workers", type=int, default=4)
+    restore_parser.add_argument("--batch-size", type=int,
+                                default=RESTORE_BATCH_SIZE)
+    restore_parser.add_argument("--restart", action="store_true",
+                                help="Ignore progress from an earlier restore.")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        manifest = verify_snapshot(args.input)
+        print(f"Snapshot OK: {manifest['count']} entries in "
+              f"{len(manifest['shards'])} shards.")
+    elif args.command == "backup":
+        manifest = backup_journal(connect_firestore(), args.output,
+                                  account_id=args.account, shards=args.shards,
+                                  workers=args.workers,
+                                  page_size=args.page_size)
+        print(f"Backed up {manifest['count']} entries to {args.output}")
+    else:
+        count = restore_journal(connect_firestore(), args.input,
+                                account_id=args.account, workers=args.workers,
+                                batch_size=args.batch_size,
+                                restart=args.restart)
+        print(f"Restored {count} entries from {args.input}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Headless batch position sizing for scanner candidates.
+
+Candidates are sized in vectorized chunks with calculate_position_sizes,
+either streamed through the command line or posted to a local HTTP service.
+
+Usage:
+    python -m core.batch_sizer size --input candidates.csv --output sized.csv \
+        --account-balance 25000 --risk-percentage 1
+    scanner | python -m core.batch_sizer size --account-balance 25000 \
+        --risk-percentage 1 > sized.csv
+    python -m core.batch_sizer serve --port 8600
+
+Each candidate has entry_price, stop_loss_price and a direction (Long/Short,
+or a buy/sell side such as Buy, B, Sell, S) or is_long_trade column. Any
+other direction is reported as the candidate's error rather than guessed. account_balance and risk_percentage may be given per
+candidate or as defaults for the whole batch. Other columns (e.g. symbol) are
+passed through unchanged.
+
+The HTTP service accepts POST /size with a JSON body, either a list of
+candidates or {"candidates": [...], "account_balance": ...,
+"risk_percentage": ...}, and answers {"results": [...]}. GET /health
+returns {"status": "ok"}.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+from core.lot_matcher import BUY_SIDES, SELL_SIDES
+from core.position_sizer import calculate_position_sizes
+
+RESULT_COLUMNS = [
+    "position_size_units", "risk_amount_dollars", "risk_per_unit",
+    "total_position_value", "error"
+]
+
+LONG_DIRECTIONS = ("LONG",) + BUY_SIDES
+SHORT_DIRECTIONS = ("SHORT",) + SELL_SIDES
+
+_TRUE_VALUES = ("true", "1", "yes", "y", "long")
+_FALSE_VALUES = ("false", "0", "no", "n", "short")
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _is_long(candidate):
+    """
+    Returns True for a long candidate, False for a short one, and None when
+    its direction is not recognised.
+    """
+    if "direction" in candidate and candidate["direction"] not in (None, ""):
+        direction = str(candidate["direction"]).strip().upper()
+        if direction in LONG_DIRECTIONS:
+            return True
+        if direction in SHORT_DIRECTIONS:
+            return False
+        return None
+    value = candidate.get("is_long_trade", True)
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in _TRUE_VALUES:
+            return True
+        if value in _FALSE_VALUES:
+            return False
+        return None
+    return bool(value)
+
+
+def size_candidates(candidates, account_balance=None, risk_percentage=None):
+    """
+    Sizes a batch of candidates in one vectorized call.
+    Args:
+        candidates (list): Dictionaries with entry_price, stop_loss_price,
+                           direction or is_long_trade, and optionally
+                           account_balance and risk_percentage.
+        account_balance (float, optional): Default for candidates without one.
+        risk_percentage (float, optional): Default for candidates without one.
+    Returns:
+        list: One dictionary per candidate: the candidate's fields plus
+              position_size_units, risk_amount_dollars, risk_per_unit,
+              total_position_value and error (None when valid).
+              Results of invalid candidates are None.
+    """
+    if not candidates:
+        return []
+
+    def column(name, default=None):
+        values = (c.get(name) for c in candidates)
+        return [_float(default if v in (None, "") else v) for v in values]
+
+    entry_prices = column("entry_price")
+    is_long = [_is_long(c) for c in candidates]
+    sizes = calculate_position_sizes(
+        account_balance=column("account_balance", account_balance),
+        risk_percentage=column("risk_percentage", risk_percentage),
+        entry_price=entry_prices,
+        stop_loss_price=column("stop_loss_price"),
+        is_long_trade=[value is not False for value in is_long],
+    )
+    errors = [
+        "Unknown direction. Use Long or Short." if is_long[i] is None
+        else sizes["error"][i]
+        for i in range(len(candidates))
+    ]
+    position_size_units = sizes["position_size_units"].tolist()
+    risk_amount_dollars = sizes["risk_amount_dollars"].tolist()
+    risk_per_unit = sizes["risk_per_unit"].tolist()
+
+    results = []
+    for i, candidate in enumerate(candidates):
+        result = dict(candidate)
+        if errors[i] is None:
+            result["position_size_units"] = position_size_units[i]
+            result["risk_amount_dollars"] = risk_amount_dollars[i]
+            result["risk_per_unit"] = risk_per_unit[i]
+            result["total_position_value"] = \
+                position_size_units[i] * entry_prices[i]
+            result["error"] = None
+        else:
+            result.update(dict.fromkeys(RESULT_COLUMNS[:-1]))
+            result["error"] = errors[i]
+        results.append(result)
+    return results
+
+
+def size_csv(input_file, output_file, account_balance=None,
+             risk_percentage=None, chunk_size=10_000):
+    """
+    Streams candidates from a CSV file, sizes them chunk by chunk and writes
+    the results as CSV, so memory is bounded by the chunk size.
+    Returns:
+        int: Number of candidates written.
+    """
+    reader = csv.DictReader(input_file)
+    fieldnames = list(reader.fieldnames or [])
+    writer = csv.DictWriter(
+        output_file,
+        fieldnames=fieldnames + [c for c in RESULT_COLUMNS if c not in fieldnames])
+    writer.writeheader()
+    count = 0
+    while True:
+        chunk = list(islice(reader, chunk_size))
+        if not chunk:
+            return count
+        writer.writerows(
+            size_candidates(chunk, account_balance, risk_percentage))
+        count += len(chunk)
+
+
+class SizingRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles batched sizing requests (see module docstring). Connections are
+    kept alive so scanners can reuse them between batches.
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = "TraderCompanionSizer/1.0"
+    # Headers and body are written separately; without TCP_NODELAY each
+    # response waits on the client's delayed ACK (~40ms).
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Not found."})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            # The body cannot be delimited, so the connection cannot be reused
+            self.close_connection = True
+            self._send_json(400, {"error": "Invalid Content-Length header."})
+            return
+        body = self.rfile.read(length)
+        if self.path != "/size":
+            self._send_json(404, {"error": "Not found."})
+            return
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            self._send_json(400, {"error": "Request body must be valid JSON."})
+            return
+
+        if isinstance(payload, dict):
+            candidates = payload.get("candidates")
+            defaults = {
+                "account_balance": payload.get("account_balance"),
+                "risk_percentage": payload.get("risk_percentage"),
+            }
+        else:
+            candidates, defaults = payload, {}
+        if not isinstance(candidates, list) or \
+           not all(isinstance(c, dict) for c in candidates):
+            self._send_json(
+                400, {"error": "Candidates must be a list of JSON objects."})
+            return
+
+        results = size_candidates(candidates, **defaults)
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the cost of small batches
+        pass
+
+
+def make_server(host="127.0.0.1", port=8600):
+    """
+    Creates the threaded sizing HTTP server (call serve_forever() to run it).
+    """
+    server = ThreadingHTTPServer((host, port), SizingRequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch position sizing.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    size_parser = subparsers.add_parser(
+        "size", help="Size candidates from a CSV file or stdin.")
+    size_parser.add_argument("--input", default="-",
+                             help="Input CSV path, or - for stdin.")
+    size_parser.add_argument("--output", default="-",
+                             help="Output CSV path, or - for stdout.")
+    size_parser.add_argument("--account-balance", type=float)
+    size_parser.add_argument("--risk-percentage", type=float)
+    size_parser.add_argument("--chunk-size", type=int, default=10_000)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run the local sizing HTTP service.")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8600)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = make_server(args.host, args.port)
+        print(f"Serving position sizing on http://{args.host}:{args.port}/size",
+              file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    input_file = sys.stdin if args.input == "-" else \
+        open(args.input, newline="", encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else \
+        open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        count = size_csv(input_file, output_file, args.account_balance,
+                         args.risk_percentage, args.chunk_size)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f"Sized {count} candidates.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
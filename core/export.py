@@ -0,0 +1,163 @@
+"""
+Streaming export of journal entries to CSV or Parquet.
+
+Entries are written page by page as they are read from Firestore, so the
+memory used by an export does not grow with the size of the journal.
+
+Usage:
+    python -m core.export --format csv --output trades.csv
+    python -m core.export --format parquet --output trades.parquet \
+        --symbol AAPL --start 2024-01-01 --end 2024-07-01
+"""
+import argparse
+import csv
+import io
+import tempfile
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.firestore_utils import connect_firestore, iter_trade_entry_pages
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+EXPORT_COLUMNS = [
+    "id", "symbol", "direction", "entry_price", "exit_price", "size", "pnl",
+    "fees", "notes", "entry_timestamp", "exit_timestamp", "created_at"
+]
+
+PARQUET_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("symbol", pa.string()),
+    ("direction", pa.string()),
+    ("entry_price", pa.float64()),
+    ("exit_price", pa.float64()),
+    ("size", pa.float64()),
+    ("pnl", pa.float64()),
+    ("fees", pa.float64()),
+    ("notes", pa.string()),
+    ("entry_timestamp", pa.timestamp("us", tz="UTC")),
+    ("exit_timestamp", pa.timestamp("us", tz="UTC")),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+])
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def export_csv(pages, output):
+    """
+    Writes pages of trade entries to CSV, one row per entry.
+    Args:
+        pages (iterable): Iterable of lists of trade entry dictionaries.
+        output: Writable text file object.
+    Returns:
+        int: Number of entries written.
+    """
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for page in pages:
+        writer.writerows(
+            [_csv_value(entry.get(column)) for column in EXPORT_COLUMNS]
+            for entry in page
+        )
+        count += len(page)
+    return count
+
+
+def export_parquet(pages, output):
+    """
+    Writes pages of trade entries to Parquet, one row group per page.
+    Args:
+        pages (iterable): Iterable of lists of trade entry dictionaries.
+        output: File path or writable binary file object.
+    Returns:
+        int: Number of entries written.
+    """
+    count = 0
+    with pq.ParquetWriter(output, PARQUET_SCHEMA) as writer:
+        for page in pages:
+            if not page:
+                continue
+            columns = {
+                column: [entry.get(column) for entry in page]
+                for column in EXPORT_COLUMNS
+            }
+            writer.write_table(pa.table(columns, schema=PARQUET_SCHEMA))
+            count += len(page)
+    return count
+
+
+def export_entries(pages, output, fmt):
+    """
+    Writes pages of trade entries in the given format ("csv" or "parquet").
+    Args:
+        pages (iterable): Iterable of lists of trade entry dictionaries.
+        output: Writable binary file object.
+        fmt (str): One of EXPORT_FORMATS.
+    Returns:
+        int: Number of entries written.
+    """
+    if fmt == "csv":
+        text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        try:
+            return export_csv(pages, text)
+        finally:
+            text.flush()
+            text.detach()
+    if fmt == "parquet":
+        return export_parquet(pages, output)
+    raise ValueError(f"Export format must be one of {EXPORT_FORMATS}.")
+
+
+def export_to_tempfile(pages, fmt):
+    """
+    Spools an export to a temporary file on disk, so the export never has to
+    be assembled in memory as one list of entries.
+    Returns:
+        tuple: (binary file object rewound to the start, number of entries).
+               The caller is responsible for closing the file.
+    """
+    export_file = tempfile.TemporaryFile()
+    try:
+        count = export_entries(pages, export_file, fmt)
+    except Exception:
+        export_file.close()
+        raise
+    export_file.seek(0)
+    return export_file, count
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the trade journal.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output", required=True, help="Output file path.")
+    parser.add_argument("--symbol", help="Only export this symbol.")
+    parser.add_argument("--start", type=_parse_date,
+                        help="Earliest entry date (YYYY-MM-DD, inclusive).")
+    parser.add_argument("--end", type=_parse_date,
+                        help="Latest entry date (YYYY-MM-DD, exclusive).")
+    parser.add_argument("--account",
+                        help="Account to export (default: unpartitioned journal).")
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    pages = iter_trade_entry_pages(
+        connect_firestore(), page_size=args.page_size, symbol=args.symbol,
+        start=args.start, end=args.end, account_id=args.account)
+    with open(args.output, "wb") as f:
+        count = export_entries(pages, f, args.format)
+    print(f"Exported {count} trade entries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
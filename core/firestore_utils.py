@@ -1,7 +1,16 @@
+import threading
 import streamlit as st
+from google.api_core import exceptions as api_exceptions
 from google.cloud import firestore
 from google.oauth2 import service_account
 from datetime import datetime, timezone
+from core.resilience import (
+    TRANSIENT_ERRORS,
+    CircuitOpenError,
+    call_with_resilience,
+    record_metric
+)
+from core.trade import Trade, entries_to_arrow, entry_columns
 
 # Attempt to import Timestamp directly, if it fails, define a dummy for testing
 try:
@@ -34,6 +43,23 @@ except ImportError:
 # This is crucial because the functions use firestore.SERVER_TIMESTAMP and firestore.Timestamp.from_datetime
 firestore.Timestamp = FirestoreTimestamp
 
+DEFAULT_ACCOUNT_LABEL = "Default"
+
+# Deadlines (seconds) for a whole call, retries included
+WRITE_DEADLINE = 10.0
+READ_DEADLINE = 15.0
+
+# Entries fetched per query when the whole journal is read
+TABLE_PAGE_SIZE = 1000
+
+# Firestore allows at most 500 writes per batch
+WRITE_BATCH_SIZE = 500
+
+# Last successful get_trade_entries/get_trade_table result per read, shared
+# by all sessions and served while the backend is unhealthy
+_entries_cache = {}
+_entries_cache_lock = threading.Lock()
+
 
 def init_firestore_client():
     """
@@ -84,15 +110,97 @@ def init_firestore_client():
     return st.session_state.get("firestore_client")
 
 
-def add_trade_entry(db, entry_data):
+def journal_collection(db, account_id=None):
+    """
+    Returns the journal collection for an account. Each account keeps its
+    entries in its own 'accounts/{account_id}/journal_entries' subcollection,
+    so queries, aggregates and the 'created_at' index only cover that
+    account's trades. Without an account, the top-level 'journal_entries'
+    collection is used (the journal from before accounts were introduced).
+    """
+    if account_id is None:
+        return db.collection("journal_entries")
+    if not account_id or "/" in account_id:
+        raise ValueError("Account ID must be non-empty and cannot contain '/'.")
+    # The account selector shows the unpartitioned journal under this label
+    if account_id == DEFAULT_ACCOUNT_LABEL:
+        raise ValueError(f"'{DEFAULT_ACCOUNT_LABEL}' is reserved for the "
+                         "journal without an account.")
+    return db.collection("accounts").document(account_id).collection(
+        "journal_entries")
+
+
+def list_accounts(db):
+    """
+    Returns the sorted IDs of all accounts in the 'accounts' collection.
+    """
+    docs = call_with_resilience(
+        lambda timeout: list(db.collection("accounts").stream(
+            timeout=timeout, retry=None)),
+        deadline=READ_DEADLINE)
+    return sorted(doc.id for doc in docs)
+
+
+def create_account(db, account_id):
+    """
+    Creates (or keeps) the 'accounts/{account_id}' document that lists the
+    account. Its journal subcollection is created with the first entry.
+    """
+    journal_collection(db, account_id)  # Validates the account ID
+    account = db.collection("accounts").document(account_id)
+    # A merged set is idempotent, so retrying it is safe
+    call_with_resilience(
+        lambda timeout: account.set({"created_at": firestore.SERVER_TIMESTAMP},
+                                    merge=True, timeout=timeout, retry=None),
+        deadline=WRITE_DEADLINE)
+
+
+def select_account(db):
+    """
+    Renders the sidebar account selector and returns the selected account ID,
+    or None for the default (unpartitioned) journal. The selection is kept in
+    st.session_state["account_id"] so it carries across pages.
+    """
+    try:
+        accounts = list_accounts(db)
+    except Exception as e:
+        st.sidebar.error(f"Error retrieving accounts: {e}")
+        accounts = []
+
+    options = [DEFAULT_ACCOUNT_LABEL] + accounts
+    selected = st.session_state.get("account_id") or DEFAULT_ACCOUNT_LABEL
+    choice = st.sidebar.selectbox(
+        "Account", options,
+        index=options.index(selected) if selected in options else 0)
+    st.session_state["account_id"] = \
+        None if choice == DEFAULT_ACCOUNT_LABEL else choice
+
+    with st.sidebar.expander("Add Account"):
+        new_account = st.text_input("Account ID",
+                                    placeholder="e.g., funded-50k")
+        if st.button("Create Account") and new_account:
+            try:
+                create_account(db, new_account.strip())
+            except Exception as e:
+                st.error(f"Error creating account: {e}")
+            else:
+                st.session_state["account_id"] = new_account.strip()
+                st.rerun()
+
+    return st.session_state["account_id"]
+
+
+def add_trade_entry(db, entry_data, account_id=None):
     """
     Adds a new trade entry to the 'journal_entries' collection in Firestore.
     Args:
         db: Firestore client instance.
-        entry_data (dict): Dictionary containing trade entry details.
-                           Expected keys: symbol, direction, entry_price,
-                           exit_price, size, pnl, notes (optional),
+        entry_data (Trade or dict): Trade, or dictionary containing trade entry
+                           details. Expected keys: symbol, direction,
+                           entry_price, exit_price, size, pnl, notes (optional),
                            entry_timestamp (optional), exit_timestamp (optional).
+        account_id (str, optional): Account to add the entry to. Defaults to
+                                    None (the unpartitioned journal).
     Returns:
         str: Document ID of the newly added entry, or None if an error occurred.
     """
@@ -101,34 +209,142 @@ def add_trade_entry(db, entry_data):
         return None
 
     try:
-        # Add created_at timestamp
-        entry_data["created_at"] = firestore.SERVER_TIMESTAMP
-
-        # Convert datetime objects to Firestore Timestamps if present
-        if "entry_timestamp" in entry_data and \
-           isinstance(entry_data["entry_timestamp"], datetime):
-            entry_data["entry_timestamp"] = \
-                firestore.Timestamp.from_datetime(entry_data["entry_timestamp"])
-        if "exit_timestamp" in entry_data and \
-           isinstance(entry_data["exit_timestamp"], datetime):
-            entry_data["exit_timestamp"] = \
-                firestore.Timestamp.from_datetime(entry_data["exit_timestamp"])
-
-        doc_ref = db.collection("journal_entries").add(entry_data)
-        return doc_ref[1].id
+        entry_data = _prepare_entry(entry_data)
+
+        # Choose the ID up front so a retried add cannot create a duplicate
+        collection = journal_collection(db, account_id)
+        doc_id = collection.document().id
+
+        def add(timeout):
+            try:
+                doc_ref = collection.add(entry_data, document_id=doc_id,
+                                         timeout=timeout, retry=None)
+            except api_exceptions.AlreadyExists:
+                return doc_id  # An earlier attempt landed before timing out
+            return doc_ref[1].id
+
+        return call_with_resilience(add, deadline=WRITE_DEADLINE)
+    except CircuitOpenError:
+        st.error("The journal backend is unavailable. The trade entry was not "
+                 "saved; please try again shortly.")
+        return None
     except Exception as e:
         st.error(f"Error adding trade entry: {e}")
         return None
 
 
-def get_trade_entries(db, limit=None):
+def add_trade_entries(db, entries, account_id=None):
+    """
+    Writes trade entries under the given document IDs in batched commits.
+    Writing to a fixed ID replaces the document, so writing the same entries
+    again (e.g. re-importing a file) does not create duplicates.
+    Args:
+        db: Firestore client instance.
+        entries (iterable): (document ID, Trade or entry dict) pairs.
+        account_id (str, optional): Account to add the entries to. Defaults to
+                                    None (the unpartitioned journal).
+    Returns:
+        list: Document IDs written. If a batch fails, the IDs committed before
+              it are returned and an error is shown.
+    """
+    if not db:
+        st.error("Firestore client not initialized. Cannot add trade entries.")
+        return []
+
+    collection = journal_collection(db, account_id)
+    written = []
+    pending = []
+
+    def commit(timeout):
+        batch = db.batch()
+        for doc_id, entry in pending:
+            batch.set(collection.document(doc_id), entry)
+        batch.commit(timeout=timeout, retry=None)
+
+    try:
+        for doc_id, entry_data in entries:
+            pending.append((doc_id, _prepare_entry(entry_data)))
+            if len(pending) == WRITE_BATCH_SIZE:
+                call_with_resilience(commit, deadline=WRITE_DEADLINE)
+                written.extend(doc_id for doc_id, _ in pending)
+                pending.clear()
+        if pending:
+            call_with_resilience(commit, deadline=WRITE_DEADLINE)
+            written.extend(doc_id for doc_id, _ in pending)
+    except CircuitOpenError:
+        st.error("The journal backend is unavailable. Some trade entries were "
+                 "not saved; please try again shortly.")
+    except Exception as e:
+        st.error(f"Error adding trade entries: {e}")
+    return written
+
+
+def _prepare_entry(entry_data):
+    """
+    Converts a Trade or entry dict into the document written to Firestore:
+    adds created_at and converts datetimes to Firestore Timestamps.
+    """
+    if isinstance(entry_data, Trade):
+        entry_data = entry_data.to_dict()
+
+    # Add created_at timestamp
+    entry_data["created_at"] = firestore.SERVER_TIMESTAMP
+
+    # Convert datetime objects to Firestore Timestamps if present
+    if "entry_timestamp" in entry_data and \
+       isinstance(entry_data["entry_timestamp"], datetime):
+        entry_data["entry_timestamp"] = \
+            firestore.Timestamp.from_datetime(entry_data["entry_timestamp"])
+    if "exit_timestamp" in entry_data and \
+       isinstance(entry_data["exit_timestamp"], datetime):
+        entry_data["exit_timestamp"] = \
+            firestore.Timestamp.from_datetime(entry_data["exit_timestamp"])
+    return entry_data
+
+
+def connect_firestore():
+    """
+    Creates a Firestore client outside of Streamlit (CLI tools, scripts).
+    Uses the GOOGLE_APPLICATION_CREDENTIALS environment variable.
+    Returns:
+        firestore.Client: Client bound to the 'fun-dead-trader' database.
+    """
+    return firestore.Client(database="fun-dead-trader")
+
+
+def _doc_to_entry(doc):
+    """
+    Converts a Firestore document snapshot into a trade entry dictionary,
+    adding the document ID as 'id' and converting Firestore Timestamps to
+    datetime objects for easier handling in Streamlit.
+    """
+    entry = doc.to_dict()
+    entry["id"] = doc.id
+    if "created_at" in entry and \
+       isinstance(entry["created_at"], firestore.Timestamp):
+        entry["created_at"] = entry["created_at"].astimezone(timezone.utc)
+    if "entry_timestamp" in entry and \
+       isinstance(entry["entry_timestamp"], firestore.Timestamp):
+        entry["entry_timestamp"] = \
+            entry["entry_timestamp"].astimezone(timezone.utc)
+    if "exit_timestamp" in entry and \
+       isinstance(entry["exit_timestamp"], firestore.Timestamp):
+        entry["exit_timestamp"] = \
+            entry["exit_timestamp"].astimezone(timezone.utc)
+    return entry
+
+
+def get_trade_entries(db, limit=None, account_id=None):
     """
     Retrieves trade entries from the 'journal_entries' collection,
-    ordered by 'created_at'.
+    ordered by 'created_at'. To read a whole journal for analysis, use
+    get_trade_table instead.
     Args:
         db: Firestore client instance.
         limit (int, optional): Maximum number of entries to retrieve.
                                Defaults to None (all).
+        account_id (str, optional): Account to read from. Defaults to None
+                                    (the unpartitioned journal).
     Returns:
         list: A list of dictionaries, each representing a trade entry.
               Includes the document ID as 'id'.
@@ -137,32 +353,140 @@ def get_trade_entries(db, limit=None):
         st.error("Firestore client not initialized. Cannot retrieve trade entries.")
         return []
 
-    try:
-        query = db.collection("journal_entries").order_by(
-            "created_at", direction=firestore.Query.DESCENDING)
-        if limit:
-            query = query.limit(limit)
-
-        docs = query.stream()
+    def read():
+        # Read in pages so READ_DEADLINE bounds each query, not the whole
+        # journal; a large journal would otherwise count as a failure
+        page_size = min(limit, TABLE_PAGE_SIZE) if limit else TABLE_PAGE_SIZE
         entries = []
-        for doc in docs:
-            entry = doc.to_dict()
-            entry["id"] = doc.id
-            # Convert Firestore Timestamps to datetime objects for easier
-            # handling in Streamlit
-            if "created_at" in entry and \
-               isinstance(entry["created_at"], firestore.Timestamp):
-                entry["created_at"] = entry["created_at"].astimezone(timezone.utc)
-            if "entry_timestamp" in entry and \
-               isinstance(entry["entry_timestamp"], firestore.Timestamp):
-                entry["entry_timestamp"] = \
-                    entry["entry_timestamp"].astimezone(timezone.utc)
-            if "exit_timestamp" in entry and \
-               isinstance(entry["exit_timestamp"], firestore.Timestamp):
-                entry["exit_timestamp"] = \
-                    entry["exit_timestamp"].astimezone(timezone.utc)
-            entries.append(entry)
+        for page in iter_trade_entry_pages(db, page_size=page_size,
+                                           account_id=account_id):
+            entries.extend(page)
+            if limit and len(entries) >= limit:
+                return entries[:limit]
         return entries
+
+    entries = _read_with_fallback(("entries", account_id, limit), read, [])
+    return [dict(entry) for entry in entries]
+
+
+def get_trade_table(db, account_id=None):
+    """
+    Retrieves all trade entries of an account as an Arrow table (see
+    core.trade.TRADE_ARROW_SCHEMA), newest first. The journal is read page by
+    page and only one page of entry dictionaries is held at a time; entries
+    that fail Trade validation are skipped.
+    Args:
+        db: Firestore client instance.
+        account_id (str, optional): Account to read from. Defaults to None
+                                    (the unpartitioned journal).
+    Returns:
+        tuple: (pa.Table, number of skipped entries)
+    """
+    if not db:
+        st.error("Firestore client not initialized. Cannot retrieve trade entries.")
+        return entries_to_arrow([])
+
+    def read():
+        columns = None
+        for page in iter_trade_entry_pages(db, page_size=TABLE_PAGE_SIZE,
+                                           account_id=account_id):
+            columns = entry_columns(page, columns)
+        return entries_to_arrow(columns=columns)
+
+    return _read_with_fallback(("table", account_id), read, entries_to_arrow([]))
+
+
+def _read_with_fallback(cache_key, read, empty):
+    """
+    Runs read() and caches its result. While the backend is unhealthy (an
+    open breaker or a transient error) the last cached result is returned
+    instead; other errors are reported and `empty` is returned.
+    """
+    try:
+        result = read()
+    except (CircuitOpenError,) + TRANSIENT_ERRORS as e:
+        # Only an unhealthy backend is papered over with the last result
+        with _entries_cache_lock:
+            cached = _entries_cache.get(cache_key)
+        if cached is None:
+            st.error(f"Error retrieving trade entries: {e}")
+            return empty
+        record_metric("cache_hits")
+        st.warning("The journal backend is unavailable; showing the last "
+                   "loaded trade entries.")
+        return cached
     except Exception as e:
         st.error(f"Error retrieving trade entries: {e}")
-        return []
+        return empty
+
+    with _entries_cache_lock:
+        _entries_cache[cache_key] = result
+    return result
+
+
+def clear_entries_cache():
+    """
+    Forgets the trade entries kept for serving while the backend is unhealthy.
+    """
+    with _entries_cache_lock:
+        _entries_cache.clear()
+
+
+def iter_trade_entry_pages(db, page_size=500, symbol=None, start=None, end=None,
+                           account_id=None):
+    """
+    Streams trade entries from the 'journal_entries' collection one page at a
+    time using cursor pagination, so only a single page is held in memory.
+    Filters are pushed down to the Firestore query. When a date range is
+    given, entries are filtered and ordered by 'entry_timestamp'; otherwise
+    they are ordered by 'created_at'.
+    Args:
+        db: Firestore client instance.
+        page_size (int): Number of entries fetched per query.
+        symbol (str, optional): Only return entries for this symbol.
+        start (datetime, optional): Earliest entry timestamp (inclusive).
+        end (datetime, optional): Latest entry timestamp (exclusive).
+        account_id (str, optional): Account to read from. Defaults to None
+                                    (the unpartitioned journal).
+    Yields:
+        list: A page of trade entry dictionaries (see get_trade_entries).
+    """
+    if page_size <= 0:
+        raise ValueError("Page size must be a positive number.")
+
+    order_field = "entry_timestamp" if start or end else "created_at"
+    query = journal_collection(db, account_id)
+    if symbol:
+        query = query.where(
+            filter=firestore.FieldFilter("symbol", "==", symbol.upper()))
+    if start:
+        query = query.where(
+            filter=firestore.FieldFilter("entry_timestamp", ">=", start))
+    if end:
+        query = query.where(
+            filter=firestore.FieldFilter("entry_timestamp", "<", end))
+    query = query.order_by(order_field, direction=firestore.Query.DESCENDING)
+
+    last_doc = None
+    while True:
+        page_query = query.limit(page_size)
+        if last_doc is not None:
+            page_query = page_query.start_after(last_doc)
+        docs = call_with_resilience(
+            lambda timeout: list(page_query.stream(timeout=timeout, retry=None)),
+            deadline=READ_DEADLINE)
+        if not docs:
+            return
+        yield [_doc_to_entry(doc) for doc in docs]
+        if len(docs) < page_size:
+            return
+        last_doc = docs[-1]
+
+
+def iter_trade_entries(db, **kwargs):
+    """
+    Streams trade entries one by one. Accepts the same keyword arguments as
+    iter_trade_entry_pages.
+    """
+    for page in iter_trade_entry_pages(db, **kwargs):
+        yield from page
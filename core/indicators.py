@@ -0,0 +1,294 @@
+"""
+Technical indicators used for stop placement, backtests and alerts.
+
+Each indicator comes in two forms that produce the same values:
+    - a vectorized function over whole price arrays (backtests, the
+      Position Sizer's bar history), returning NaN until warmed up;
+    - a streaming class whose update() takes one new bar in O(1) and
+      returns the current value, or None until warmed up (live alerts).
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+STOP_METHODS = ("ATR", "Donchian")
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=float)
+
+
+def _check_window(window):
+    if not isinstance(window, int) or window <= 0:
+        raise ValueError("Window must be a positive integer.")
+
+
+# Vectorized forms
+
+def true_range(high, low, close):
+    """
+    True range of each bar: the largest of high - low and the gaps from the
+    previous close. The first bar has no previous close and uses high - low.
+    """
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    ranges = np.vstack((high - low, np.abs(high - prev_close),
+                        np.abs(low - prev_close)))
+    return np.nanmax(ranges, axis=0)
+
+
+def sma(values, window):
+    """
+    Simple moving average over the last `window` values.
+    """
+    _check_window(window)
+    return pd.Series(_as_array(values)).rolling(window).mean().to_numpy()
+
+
+def ema(values, span):
+    """
+    Exponential moving average with alpha = 2 / (span + 1), seeded with the
+    first value.
+    """
+    _check_window(span)
+    return pd.Series(_as_array(values)).ewm(
+        span=span, adjust=False).mean().to_numpy()
+
+
+def atr(high, low, close, period=14):
+    """
+    Average true range with Wilder's smoothing, seeded with the simple
+    average of the first `period` true ranges.
+    """
+    _check_window(period)
+    tr = true_range(high, low, close)
+    result = np.full(len(tr), np.nan)
+    if len(tr) < period:
+        return result
+    seeded = tr[period - 1:].copy()
+    seeded[0] = tr[:period].mean()
+    result[period - 1:] = pd.Series(seeded).ewm(
+        alpha=1 / period, adjust=False).mean().to_numpy()
+    return result
+
+
+def donchian(high, low, window=20):
+    """
+    Donchian channel: highest high and lowest low of the last `window` bars.
+    Returns:
+        tuple: (upper, lower) arrays.
+    """
+    _check_window(window)
+    upper = pd.Series(_as_array(high)).rolling(window).max().to_numpy()
+    lower = pd.Series(_as_array(low)).rolling(window).min().to_numpy()
+    return upper, lower
+
+
+def volatility(close, window=20):
+    """
+    Rolling standard deviation (sample) of log returns over the last
+    `window` returns. Not annualized.
+    """
+    _check_window(window)
+    returns = np.log(pd.Series(_as_array(close))).diff()
+    return returns.rolling(window).std().to_numpy()
+
+
+# Streaming forms
+
+class SMA:
+    """Streaming simple moving average (running sum over a fixed window)."""
+
+    def __init__(self, window):
+        _check_window(window)
+        self.window = window
+        self._values = deque()
+        self._sum = 0.0
+
+    def update(self, value):
+        self._values.append(value)
+        self._sum += value
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        if len(self._values) < self.window:
+            return None
+        return self._sum / self.window
+
+
+class EMA:
+    """Streaming exponential moving average, seeded with the first value."""
+
+    def __init__(self, span):
+        _check_window(span)
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def update(self, value):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class ATR:
+    """Streaming average true range with Wilder's smoothing."""
+
+    def __init__(self, period=14):
+        _check_window(period)
+        self.period = period
+        self.value = None
+        self._prev_close = None
+        self._seed = []
+
+    def update(self, high, low, close):
+        if self._prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._prev_close),
+                     abs(low - self._prev_close))
+        self._prev_close = close
+
+        if self.value is None:
+            self._seed.append(tr)
+            if len(self._seed) == self.period:
+                self.value = sum(self._seed) / self.period
+                self._seed = []
+            return self.value
+        self.value += (tr - self.value) / self.period
+        return self.value
+
+
+class RollingMax:
+    """
+    Streaming maximum of the last `window` values. A monotonic deque keeps
+    only values that can still become the maximum, so each update is
+    amortized O(1).
+    """
+
+    def __init__(self, window):
+        _check_window(window)
+        self.window = window
+        self._count = 0
+        self._candidates = deque()  # (index, value), values decreasing
+
+    def _keep(self, new, old):
+        return old > new
+
+    def update(self, value):
+        index = self._count
+        self._count += 1
+        while self._candidates and \
+                not self._keep(value, self._candidates[-1][1]):
+            self._candidates.pop()
+        self._candidates.append((index, value))
+        if self._candidates[0][0] <= index - self.window:
+            self._candidates.popleft()
+        if self._count < self.window:
+            return None
+        return self._candidates[0][1]
+
+
+class RollingMin(RollingMax):
+    """Streaming minimum of the last `window` values (see RollingMax)."""
+
+    def _keep(self, new, old):
+        return old < new
+
+
+class Donchian:
+    """Streaming Donchian channel; update() returns (upper, lower)."""
+
+    def __init__(self, window=20):
+        self._upper = RollingMax(window)
+        self._lower = RollingMin(window)
+
+    def update(self, high, low):
+        upper = self._upper.update(high)
+        lower = self._lower.update(low)
+        if upper is None:
+            return None
+        return upper, lower
+
+
+class Volatility:
+    """
+    Streaming rolling standard deviation of log returns, from running sums
+    over the last `window` returns.
+    """
+
+    def __init__(self, window=20):
+        _check_window(window)
+        if window < 2:
+            raise ValueError("Volatility window must be at least 2.")
+        self.window = window
+        self._prev_close = None
+        self._returns = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def update(self, close):
+        prev_close, self._prev_close = self._prev_close, close
+        if prev_close is None:
+            return None
+        r = math.log(close / prev_close)
+        self._returns.append(r)
+        self._sum += r
+        self._sum_sq += r * r
+        if len(self._returns) > self.window:
+            old = self._returns.popleft()
+            self._sum -= old
+            self._sum_sq -= old * old
+        if len(self._returns) < self.window:
+            return None
+        n = self.window
+        variance = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+# Stop placement
+
+def suggest_stop(high, low, close, entry_price, is_long_trade, method="ATR",
+                 atr_period=14, atr_multiplier=2.0, channel_window=20):
+    """
+    Suggests a stop loss price from recent bars.
+        "ATR":      entry_price -/+ atr_multiplier * ATR(atr_period)
+        "Donchian": the lowest low (long) or highest high (short) of the last
+                    channel_window bars
+    Returns:
+        float: The suggested stop loss price.
+    Raises:
+        ValueError: If there are not enough bars, a bar has a missing price
+                    (ATR), or the stop is missing or would not be on the
+                    losing side of the entry price.
+    """
+    if method == "ATR":
+        if len(close) < atr_period:
+            raise ValueError(f"At least {atr_period} bars are needed for ATR.")
+        # true_range skips missing prices, which would quietly shrink the ATR
+        if not all(np.isfinite(_as_array(bars)).all()
+                   for bars in (high, low, close)):
+            raise ValueError("Bars must not have missing prices for ATR.")
+        distance = atr_multiplier * atr(high, low, close, atr_period)[-1]
+        stop = entry_price - distance if is_long_trade else entry_price + distance
+    elif method == "Donchian":
+        if len(close) < channel_window:
+            raise ValueError(
+                f"At least {channel_window} bars are needed for the channel.")
+        upper, lower = donchian(high, low, channel_window)
+        stop = lower[-1] if is_long_trade else upper[-1]
+    else:
+        raise ValueError(f"Stop method must be one of {STOP_METHODS}.")
+
+    if not math.isfinite(stop):
+        raise ValueError("Suggested stop is missing; check the bars for "
+                         "missing prices.")
+    if stop <= 0:
+        raise ValueError("Suggested stop is not a positive price.")
+    if (is_long_trade and stop >= entry_price) or \
+       (not is_long_trade and stop <= entry_price):
+        raise ValueError("Suggested stop is not beyond the entry price for "
+                         "this trade direction.")
+    return float(stop)
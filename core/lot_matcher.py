@@ -0,0 +1,199 @@
+import csv
+import hashlib
+from collections import deque
+from datetime import datetime, timezone
+
+from core.trade import Trade
+
+BUY_SIDES = ("BUY", "B", "BOT", "BOUGHT")
+SELL_SIDES = ("SELL", "S", "SLD", "SOLD")
+MATCHING_METHODS = ("FIFO", "LIFO")
+
+# Index positions inside an open lot. Lots are small mutable lists rather than
+# dicts so a symbol with thousands of scale-ins stays cheap to hold.
+_QTY, _PRICE, _FEE_PER_UNIT, _TIMESTAMP = range(4)
+
+# Index positions inside the running totals of a symbol's open round trip
+_CLOSED_QTY, _ENTRY_COST, _EXIT_VALUE, _FEES, _OPENED_AT = range(5)
+
+# Quantities below this are treated as zero to absorb float rounding
+_EPSILON = 1e-9
+
+
+def _parse_timestamp(value):
+    """
+    Parses a fill timestamp into a timezone-aware datetime (UTC if naive).
+    Accepts datetime objects or ISO 8601 strings.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str) and value.strip():
+        dt = datetime.fromisoformat(value.strip())
+    else:
+        raise ValueError(f"Invalid fill timestamp: {value!r}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _signed_quantity(fill):
+    """
+    Returns the fill quantity signed by side: positive for buys,
+    negative for sells.
+    """
+    side = str(fill.get("side", "")).strip().upper()
+    quantity = float(fill["quantity"])
+    if quantity <= 0:
+        raise ValueError("Fill quantity must be a positive number.")
+    if side in BUY_SIDES:
+        return quantity
+    if side in SELL_SIDES:
+        return -quantity
+    raise ValueError(f"Unknown fill side: {fill.get('side')!r}")
+
+
+def match_fills(fills, method="FIFO"):
+    """
+    Pairs raw broker fills into closed round-trip trades using FIFO or LIFO
+    lot matching per symbol.
+
+    Fills are consumed as a stream and must be in chronological order per
+    symbol. Only the open lots of each symbol are kept in memory, in a
+    time-sorted deque, so matching is linear in the number of fills.
+
+    A round trip lasts from a flat position until the position is flat
+    again. Each fill that reduces the position closes open lots, and the
+    matched quantities are added to the round trip's running totals. Once
+    the position is flat, one trade is yielded:
+    - the entry price is the quantity-weighted price of all closed lots;
+    - the exit price is the quantity-weighted price of all closing fills;
+    - fees are the pro-rated fees of every fill involved.
+    A fill that crosses through zero ends the round trip and opens a new one
+    in the other direction with the remaining quantity. Because a round trip
+    closes every lot it opened, FIFO and LIFO only differ in the order lots
+    are consumed, not in the trade that is yielded.
+
+    Args:
+        fills (iterable): Dictionaries with keys symbol, side (Buy/Sell),
+                          quantity, price, timestamp and fee (optional).
+        method (str): "FIFO" or "LIFO".
+    Yields:
+        Trade: A validated round-trip trade, including fees.
+    """
+    method = method.upper()
+    if method not in MATCHING_METHODS:
+        raise ValueError(f"Matching method must be one of {MATCHING_METHODS}.")
+    lifo = method == "LIFO"
+
+    # symbol -> deque of open lots; lot quantities share the position's sign
+    open_lots = {}
+    # symbol -> running totals of the open round trip (see _CLOSED_QTY)
+    round_trips = {}
+    last_seen = {}
+
+    for fill in fills:
+        symbol = str(fill["symbol"]).strip().upper()
+        if not symbol:
+            raise ValueError("Fill symbol is required.")
+        quantity = _signed_quantity(fill)
+        price = float(fill["price"])
+        if price <= 0:
+            raise ValueError("Fill price must be a positive number.")
+        fee = float(fill.get("fee") or 0.0)
+        timestamp = _parse_timestamp(fill["timestamp"])
+
+        if symbol in last_seen and timestamp < last_seen[symbol]:
+            raise ValueError(
+                f"Fills for {symbol} are not in chronological order "
+                f"({timestamp.isoformat()} after {last_seen[symbol].isoformat()})."
+            )
+        last_seen[symbol] = timestamp
+
+        lots = open_lots.setdefault(symbol, deque())
+        fee_per_unit = fee / abs(quantity)
+        remaining = abs(quantity)
+
+        # The fill reduces the position when it has the opposite sign
+        if lots and (lots[0][_QTY] > 0) != (quantity > 0):
+            is_long = lots[0][_QTY] > 0
+            totals = round_trips.setdefault(symbol, [0.0, 0.0, 0.0, 0.0, None])
+
+            while lots and remaining > _EPSILON:
+                lot = lots[-1] if lifo else lots[0]
+                take = min(abs(lot[_QTY]), remaining)
+                totals[_CLOSED_QTY] += take
+                totals[_ENTRY_COST] += take * lot[_PRICE]
+                totals[_EXIT_VALUE] += take * price
+                totals[_FEES] += take * (lot[_FEE_PER_UNIT] + fee_per_unit)
+                if totals[_OPENED_AT] is None or lot[_TIMESTAMP] < totals[_OPENED_AT]:
+                    totals[_OPENED_AT] = lot[_TIMESTAMP]
+                remaining -= take
+                if abs(lot[_QTY]) - take <= _EPSILON:
+                    if lifo:
+                        lots.pop()
+                    else:
+                        lots.popleft()
+                else:
+                    lot[_QTY] += take if lot[_QTY] < 0 else -take
+
+            if not lots:
+                # Flat: the round trip is complete
+                del round_trips[symbol]
+                closed_qty = totals[_CLOSED_QTY]
+                yield Trade(
+                    symbol=symbol,
+                    direction="Long" if is_long else "Short",
+                    entry_price=totals[_ENTRY_COST] / closed_qty,
+                    exit_price=totals[_EXIT_VALUE] / closed_qty,
+                    size=closed_qty,
+                    entry_timestamp=totals[_OPENED_AT],
+                    exit_timestamp=timestamp,
+                    fees=totals[_FEES],
+                )
+
+        if remaining > _EPSILON:
+            signed = remaining if quantity > 0 else -remaining
+            lots.append([signed, price, fee_per_unit, timestamp])
+        elif not lots:
+            # Drop flat symbols so memory tracks open positions only
+            del open_lots[symbol]
+
+
+def round_trip_id(trade, method="FIFO"):
+    """
+    Returns a deterministic document ID for an imported round-trip trade, so
+    importing the same fills again overwrites the earlier entries instead of
+    duplicating them.
+    Args:
+        trade (Trade): Trade yielded by match_fills.
+        method (str): Matching method the trade was produced with.
+    Returns:
+        str: 20-character hex ID, the length of a Firestore auto-ID.
+    """
+    key = "|".join([
+        trade.symbol,
+        trade.entry_timestamp.isoformat(),
+        trade.exit_timestamp.isoformat(),
+        method.upper(),
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:20]
+
+
+def iter_fills_csv(path_or_file):
+    """
+    Streams fills from a broker CSV export, one row at a time.
+    Expects the columns symbol, side, quantity, price, timestamp and,
+    optionally, fee (header names are case-insensitive).
+    Args:
+        path_or_file: File path or an open text file object.
+    Yields:
+        dict: One fill per CSV row.
+    """
+    if isinstance(path_or_file, str):
+        with open(path_or_file, newline="") as f:
+            yield from iter_fills_csv(f)
+        return
+
+    reader = csv.DictReader(path_or_file)
+    for row in reader:
+        yield {key.strip().lower(): value for key, value in row.items() if key}
@@ -0,0 +1,111 @@
+"""
+Moves entries from the unpartitioned 'journal_entries' collection into
+per-account 'accounts/{account_id}/journal_entries' subcollections.
+
+Document IDs are kept, so the migration can be re-run safely after an
+interruption: entries that were already copied are simply overwritten.
+
+Usage:
+    python -m core.migrate_accounts --account funded-50k
+    python -m core.migrate_accounts --by-field account_id --account main
+    python -m core.migrate_accounts --account funded-50k --delete
+"""
+import argparse
+
+from core.firestore_utils import (
+    READ_DEADLINE,
+    WRITE_DEADLINE,
+    connect_firestore,
+    create_account,
+    journal_collection
+)
+from core.resilience import call_with_resilience
+
+# Firestore allows at most 500 writes per batch; a copy plus a delete is two
+BATCH_SIZE = 200
+
+
+def migrate_entries(db, account_id=None, by_field=None, delete=False,
+                    batch_size=BATCH_SIZE):
+    """
+    Copies every entry of the unpartitioned journal into an account.
+    Args:
+        db: Firestore client instance.
+        account_id (str, optional): Account that receives the entries (or the
+                                    entries without a by_field value).
+        by_field (str, optional): Entry field naming the target account, e.g.
+                                  'account_id'. The field is removed from the
+                                  copied entry.
+        delete (bool): Delete each original entry in the same batch as its
+                       copy.
+        batch_size (int): Entries written per batch commit.
+    Returns:
+        dict: Number of migrated entries per account ID.
+    """
+    if account_id is None and by_field is None:
+        raise ValueError("Provide an account ID, a field to read it from, "
+                         "or both.")
+
+    source = journal_collection(db)
+    counts = {}
+    created = set()
+    last_doc = None
+    while True:
+        query = source.order_by("__name__").limit(batch_size)
+        if last_doc is not None:
+            query = query.start_after(last_doc)
+        docs = call_with_resilience(
+            lambda timeout: list(query.stream(timeout=timeout, retry=None)),
+            deadline=READ_DEADLINE)
+        if not docs:
+            return counts
+
+        batch = db.batch()
+        for doc in docs:
+            entry = doc.to_dict()
+            target = account_id
+            if by_field:
+                target = entry.pop(by_field, None) or account_id
+            if target is None:
+                continue
+            if target not in created:
+                create_account(db, target)
+                created.add(target)
+            batch.set(journal_collection(db, target).document(doc.id), entry)
+            if delete:
+                batch.delete(doc.reference)
+            counts[target] = counts.get(target, 0) + 1
+        # Copies keep their IDs and deletes are idempotent, so a retried
+        # commit is safe
+        call_with_resilience(
+            lambda timeout: batch.commit(timeout=timeout, retry=None),
+            deadline=WRITE_DEADLINE)
+
+        if len(docs) < batch_size:
+            return counts
+        last_doc = docs[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Move journal entries into per-account subcollections.")
+    parser.add_argument("--account",
+                        help="Target account (or fallback with --by-field).")
+    parser.add_argument("--by-field",
+                        help="Entry field holding each entry's account ID.")
+    parser.add_argument("--delete", action="store_true",
+                        help="Delete the original entries after copying.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    counts = migrate_entries(connect_firestore(), account_id=args.account,
+                             by_field=args.by_field, delete=args.delete,
+                             batch_size=args.batch_size)
+    for account_id, count in sorted(counts.items()):
+        print(f"{account_id}: migrated {count} entries")
+    if not counts:
+        print("No entries to migrate.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import json
+import os
+import re
+import tempfile
+import threading
+
+import streamlit as st
+
+NOTES_INDEX_PATH = os.path.join(".trader_companion", "notes_index.json")
+
+# save() appends new entries to a log next to the index file; once the log
+# holds this many entries it is compacted into the index file
+COMPACT_AFTER = 1000
+
+# Words in notes and queries; hashtags are matched separately as tags
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9_'-]*")
+_TAG_RE = re.compile(r"#([A-Za-z0-9][A-Za-z0-9_-]*)")
+
+# Filler words that would match almost every note and are not worth indexing
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from",
+    "i", "in", "is", "it", "my", "of", "on", "or", "so", "the", "to", "was",
+    "with",
+})
+
+
+def extract_tags(notes):
+    """
+    Extracts lowercase hashtags (setups, emotions, mistakes) from free-text
+    notes, e.g. "Chased the #breakout, pure #FOMO" -> {"breakout", "fomo"}.
+    """
+    return {tag.lower() for tag in _TAG_RE.findall(notes or "")}
+
+
+def tokenize(text):
+    """
+    Splits free text into lowercase search terms, dropping stop words.
+    Hashtags also produce a plain term so "fomo" matches "#fomo".
+    """
+    return {
+        word.strip("'-") for word in _WORD_RE.findall((text or "").lower())
+        if word not in STOP_WORDS
+    } - {""}
+
+
+def parse_query(query, known_symbols=None):
+    """
+    Parses a search query into its parts:
+        "#tag"          - entries tagged with tag
+        "symbol:TSLA"   - entries for the symbol (also "$TSLA")
+        other words     - entries whose notes contain the word
+    All parts must match. A "on" between parts is ignored, so queries such as
+    "#fomo on TSLA" read naturally; a bare word in capitals is treated as a
+    symbol.
+    Args:
+        query (str): The search query.
+        known_symbols (container, optional): Symbols that exist in the
+            journal. When given, a bare word in capitals that is not one of
+            them (e.g. "VWAP" or "FOMO") is searched for in the notes instead.
+    Returns:
+        tuple: (set of tags, set of symbols, set of terms)
+    """
+    tags, symbols, terms = set(), set(), set()
+    for part in (query or "").split():
+        if part.startswith("#") and len(part) > 1:
+            tags.add(part[1:].lower())
+        elif part.lower().startswith("symbol:") and len(part) > 7:
+            symbols.add(part[7:].upper())
+        elif part.startswith("$") and len(part) > 1:
+            symbols.add(part[1:].upper())
+        elif part.isupper() and part.isalnum() and (
+                known_symbols is None or part in known_symbols):
+            symbols.add(part)
+        else:
+            terms |= tokenize(part)
+    return tags, symbols, terms
+
+
+class NotesIndex:
+    """
+    Inverted index over trade notes, tags and symbols, kept locally so the
+    journal can be searched without Firestore support for text queries.
+
+    The index is built incrementally: add() only tokenizes entries it has not
+    seen before, so syncing with the latest journal entries stays cheap.
+    Queries intersect posting sets, smallest first. An index is shared by all
+    sessions (see get_notes_index), so every method takes the index's lock.
+    """
+
+    def __init__(self):
+        self.terms = {}
+        self.tags = {}
+        self.symbols = {}
+        self.indexed_ids = set()
+        # Entries added since the last save, and entries in the log file
+        self._unsaved = []
+        self._logged = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.indexed_ids)
+
+    def add(self, entry_id, entry):
+        """
+        Indexes a trade entry. Returns False if the ID was already indexed.
+        """
+        with self._lock:
+            if not self._add(entry_id, entry):
+                return False
+            self._unsaved.append({"id": entry_id, "symbol": entry.get("symbol"),
+                                  "notes": entry.get("notes")})
+            return True
+
+    def _add(self, entry_id, entry):
+        if not entry_id or entry_id in self.indexed_ids:
+            return False
+        notes = entry.get("notes") or ""
+        for term in tokenize(notes):
+            self.terms.setdefault(term, set()).add(entry_id)
+        for tag in extract_tags(notes):
+            self.tags.setdefault(tag, set()).add(entry_id)
+        symbol = (entry.get("symbol") or "").upper()
+        if symbol:
+            self.symbols.setdefault(symbol, set()).add(entry_id)
+        self.indexed_ids.add(entry_id)
+        return True
+
+    def sync(self, entries):
+        """
+        Indexes any entries (dicts with an 'id' key) not yet in the index.
+        Returns the number of newly indexed entries.
+        """
+        with self._lock:
+            return sum(self.add(entry.get("id"), entry) for entry in entries)
+
+    def sync_table(self, table):
+        """
+        Indexes the rows of a trade table (see core.trade.entries_to_arrow)
+        whose 'id' is not yet in the index, reading only those rows' symbol
+        and notes. Returns the number of newly indexed entries.
+        """
+        ids = table.column("id").to_pylist()
+        with self._lock:
+            new_rows = [i for i, entry_id in enumerate(ids)
+                        if entry_id and entry_id not in self.indexed_ids]
+            if not new_rows:
+                return 0
+            rows = table.select(["id", "symbol", "notes"]).take(new_rows)
+            return sum(self.add(row["id"], row) for row in rows.to_pylist())
+
+    def search(self, query):
+        """
+        Returns the set of entry IDs matching every part of the query
+        (see parse_query); a bare word in capitals only matches as a symbol
+        if that symbol is indexed. An empty query matches nothing.
+        """
+        with self._lock:
+            tags, symbols, terms = parse_query(query, self.symbols)
+            postings = (
+                [self.tags.get(tag, set()) for tag in tags]
+                + [self.symbols.get(symbol, set()) for symbol in symbols]
+                + [self.terms.get(term, set()) for term in terms]
+            )
+            if not postings:
+                return set()
+            postings.sort(key=len)
+            result = set(postings[0])
+            for posting in postings[1:]:
+                if not result:
+                    break
+                result &= posting
+            return result
+
+    def tag_counts(self):
+        """
+        Returns a dict of tag -> number of entries, most used first.
+        """
+        with self._lock:
+            counts = [(tag, len(ids)) for tag, ids in self.tags.items()]
+        return dict(sorted(counts, key=lambda item: (-item[1], item[0])))
+
+    def save(self, path):
+        """
+        Persists the entries added since the last save by appending them to
+        the index's log file (path + ".log"). Once the log holds COMPACT_AFTER
+        entries, it is compacted into the index file (see compact()).
+        """
+        with self._lock:
+            if not self._unsaved:
+                return
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # One write per save in append mode, so saves from other
+            # processes add whole lines rather than interleaving
+            lines = "".join(json.dumps(entry) + "\n" for entry in self._unsaved)
+            with open(path + ".log", "a", encoding="utf-8") as f:
+                f.write(lines)
+            self._logged += len(self._unsaved)
+            self._unsaved.clear()
+            if self._logged >= COMPACT_AFTER:
+                self.compact(path)
+
+    def compact(self, path):
+        """
+        Rewrites the index file with everything indexed so far and empties
+        the log. The file and log are read back and merged first, so entries
+        saved by another process are not lost; the file is replaced
+        atomically via a temporary file.
+        """
+        with self._lock:
+            self._merge(type(self).load(path))
+            data = {
+                "ids": sorted(self.indexed_ids),
+                "terms": {k: sorted(v) for k, v in self.terms.items()},
+                "tags": {k: sorted(v) for k, v in self.tags.items()},
+                "symbols": {k: sorted(v) for k, v in self.symbols.items()},
+            }
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # A unique temporary file per writer, so concurrent writers never
+            # interleave their output
+            fd, tmp_path = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            # Entries added since the last save are now in the index file
+            with open(path + ".log", "w", encoding="utf-8"):
+                pass
+            self._logged = 0
+            self._unsaved.clear()
+
+    def _merge(self, other):
+        """
+        Adds the postings of entries indexed by other but not by this index.
+        """
+        new_ids = other.indexed_ids - self.indexed_ids
+        if not new_ids:
+            return
+        for own, theirs in ((self.terms, other.terms), (self.tags, other.tags),
+                            (self.symbols, other.symbols)):
+            for key, ids in theirs.items():
+                ids = ids & new_ids
+                if ids:
+                    own.setdefault(key, set()).update(ids)
+        self.indexed_ids |= new_ids
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an index saved with save(): the index file, then the entries in
+        its log. Returns an empty index if neither exists.
+        """
+        index = cls()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            index.indexed_ids = set(data.get("ids", []))
+            index.terms = {k: set(v) for k, v in data.get("terms", {}).items()}
+            index.tags = {k: set(v) for k, v in data.get("tags", {}).items()}
+            index.symbols = {k: set(v) for k, v in data.get("symbols", {}).items()}
+        if os.path.exists(path + ".log"):
+            with open(path + ".log", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by a crash mid-save
+                    index._add(entry.get("id"), entry)
+                    index._logged += 1
+        return index
+
+
+@st.cache_resource
+def get_notes_index(path=NOTES_INDEX_PATH):
+    """
+    Returns the notes index shared by all sessions of this process, loading
+    it from the local index file the first time it is needed.
+    """
+    return NotesIndex.load(path)
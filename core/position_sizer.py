@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def calculate_position_size(
     account_balance: float,
     risk_percentage: float,
@@ -61,3 +64,76 @@ def calculate_position_size(
         "risk_amount_dollars": risk_amount_dollars,
         "risk_per_unit": risk_per_unit,
     }
+
+
+def calculate_position_sizes(
+    account_balance,
+    risk_percentage,
+    entry_price,
+    stop_loss_price,
+    is_long_trade,
+) -> dict:
+    """
+    Vectorized form of calculate_position_size for batches of candidates.
+    Accepts scalars or equal-length arrays (scalars are broadcast) and
+    applies the same validation rules row by row. Invalid rows get NaN
+    results and the message calculate_position_size would raise.
+    Returns a dictionary of numpy arrays: {'position_size_units',
+    'risk_amount_dollars', 'risk_per_unit', 'error'}; 'error' is None for
+    valid rows.
+    """
+    account_balance, risk_percentage, entry_price, stop_loss_price = (
+        np.asarray(value, dtype=float) for value in
+        (account_balance, risk_percentage, entry_price, stop_loss_price)
+    )
+    is_long_trade = np.asarray(is_long_trade, dtype=bool)
+    account_balance, risk_percentage, entry_price, stop_loss_price, \
+        is_long_trade = np.broadcast_arrays(
+            account_balance, risk_percentage, entry_price, stop_loss_price,
+            is_long_trade)
+
+    errors = np.full(account_balance.shape, None, dtype=object)
+    invalid = np.zeros(account_balance.shape, dtype=bool)
+
+    def reject(mask, message):
+        mask = mask & ~invalid
+        errors[mask] = message
+        invalid[mask] = True
+
+    # Same checks, in the same order, as calculate_position_size.
+    # Comparisons are written so that NaN inputs are rejected too.
+    reject(~(account_balance > 0), "Account balance must be a positive number.")
+    reject(
+        ~((risk_percentage > 0) & (risk_percentage <= 100)),
+        "Risk percentage must be between 0 and 100 "
+        "(exclusive of 0, inclusive of 100).",
+    )
+    reject(~(entry_price > 0), "Entry price must be a positive number.")
+    reject(~(stop_loss_price > 0), "Stop loss price must be a positive number.")
+    reject(
+        is_long_trade & (stop_loss_price > entry_price),
+        "For a long trade, stop loss price must be less than entry price.",
+    )
+    reject(
+        ~is_long_trade & (stop_loss_price < entry_price),
+        "For a short trade, stop loss price must be greater than entry price.",
+    )
+    risk_per_unit = np.where(
+        is_long_trade, entry_price - stop_loss_price, stop_loss_price - entry_price
+    )
+    reject(
+        ~(risk_per_unit > 0),
+        "Risk per unit cannot be zero or negative. "
+        "Adjust entry and stop loss prices.",
+    )
+
+    risk_amount_dollars = account_balance * (risk_percentage / 100)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        position_size_units = risk_amount_dollars / risk_per_unit
+
+    return {
+        "position_size_units": np.where(invalid, np.nan, position_size_units),
+        "risk_amount_dollars": np.where(invalid, np.nan, risk_amount_dollars),
+        "risk_per_unit": np.where(invalid, np.nan, risk_per_unit),
+        "error": errors,
+    }
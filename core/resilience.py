@@ -0,0 +1,177 @@
+"""
+Deadlines, retries and a circuit breaker for Firestore calls.
+
+Every call gets an overall deadline that bounds its latency, including
+retries. Only transient backend errors are retried, with exponential backoff
+and full jitter. A circuit breaker shared by all sessions of the process
+opens after repeated failures, so calls fail fast instead of piling up on an
+unhealthy backend, and lets a single trial call through once the reset
+timeout has passed.
+"""
+import random
+import threading
+import time
+from collections import Counter
+
+from google.api_core import exceptions as api_exceptions
+
+# Errors that say nothing about the request itself and are worth retrying
+TRANSIENT_ERRORS = (
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.TooManyRequests,
+    api_exceptions.Aborted,
+    api_exceptions.GatewayTimeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+DEFAULT_DEADLINE = 10.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.2
+DEFAULT_MAX_DELAY = 2.0
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+
+def record_metric(name, count=1):
+    with _metrics_lock:
+        _metrics[name] += count
+
+
+def get_metrics():
+    """
+    Returns a snapshot of the resilience counters (calls, retries, failures,
+    deadline_exceeded, short_circuits, cache_hits) and the shared breaker's
+    state.
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics["breaker_state"] = FIRESTORE_BREAKER.state
+    return metrics
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+        closed:    calls go through; consecutive failures are counted.
+        open:      calls are refused until reset_timeout has passed.
+        half_open: one trial call goes through; success closes the breaker,
+                   failure opens it again.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self):
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+    def reset(self):
+        self.record_success()
+
+
+# Shared by every session in the process, so one unhealthy backend is
+# detected once rather than per session
+FIRESTORE_BREAKER = CircuitBreaker()
+
+
+def call_with_resilience(fn, deadline=DEFAULT_DEADLINE,
+                         max_attempts=DEFAULT_MAX_ATTEMPTS,
+                         base_delay=DEFAULT_BASE_DELAY,
+                         max_delay=DEFAULT_MAX_DELAY,
+                         breaker=FIRESTORE_BREAKER,
+                         clock=time.monotonic, sleep=time.sleep):
+    """
+    Calls fn(timeout) with the time left before the deadline, retrying
+    transient errors with jittered exponential backoff.
+    Args:
+        fn (callable): Takes the remaining timeout in seconds; should pass it
+                       on to the Firestore call.
+        deadline (float): Overall time budget in seconds, including retries.
+        max_attempts (int): Maximum number of calls.
+    Returns:
+        The result of fn.
+    Raises:
+        CircuitOpenError: If the breaker refuses the call.
+        Exception: The last transient error once attempts or time run out,
+                   or any non-transient error immediately.
+    """
+    record_metric("calls")
+    expires = clock() + deadline
+    attempt = 0
+    while True:
+        if not breaker.allow_request():
+            record_metric("short_circuits")
+            raise CircuitOpenError("Firestore circuit breaker is open.")
+        attempt += 1
+        try:
+            result = fn(max(expires - clock(), 0.0))
+        except TRANSIENT_ERRORS as e:
+            breaker.record_failure()
+            if isinstance(e, (api_exceptions.DeadlineExceeded, TimeoutError)):
+                record_metric("deadline_exceeded")
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if attempt >= max_attempts or clock() + delay >= expires:
+                record_metric("failures")
+                raise
+            record_metric("retries")
+            sleep(delay)
+        except Exception:
+            # The backend answered; the request itself was wrong
+            breaker.record_success()
+            record_metric("failures")
+            raise
+        else:
+            breaker.record_success()
+            return result
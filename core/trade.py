@@ -0,0 +1,382 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DIRECTIONS = ("Long", "Short")
+
+# Numeric columnar layout for large trade collections. Free-text fields
+# (notes, id) are left out; use trades_to_arrow when they are needed.
+TRADE_DTYPE = np.dtype([
+    ("symbol", "U16"),
+    ("is_long", "?"),
+    ("entry_price", "f8"),
+    ("exit_price", "f8"),
+    ("size", "f8"),
+    ("fees", "f8"),
+    ("pnl", "f8"),
+    ("entry_timestamp", "datetime64[us]"),
+    ("exit_timestamp", "datetime64[us]"),
+])
+
+TRADE_ARROW_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("symbol", pa.dictionary(pa.int32(), pa.string())),
+    ("direction", pa.dictionary(pa.int8(), pa.string())),
+    ("entry_price", pa.float64()),
+    ("exit_price", pa.float64()),
+    ("size", pa.float64()),
+    ("fees", pa.float64()),
+    ("pnl", pa.float64()),
+    ("entry_timestamp", pa.timestamp("us", tz="UTC")),
+    ("exit_timestamp", pa.timestamp("us", tz="UTC")),
+    ("notes", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+])
+
+# Journal entry fields stored per trade; 'pnl' is always recomputed
+ENTRY_FIELDS = tuple(name for name in TRADE_ARROW_SCHEMA.names if name != "pnl")
+
+# Validation rules, shared by Trade and entries_to_arrow so that both accept
+# exactly the same entries. Numeric fields must be finite int or float
+# values; the flag says whether zero is allowed.
+NUMERIC_RULES = {
+    "entry_price": False,
+    "exit_price": False,
+    "size": False,
+    "fees": True,
+}
+TIMESTAMP_FIELDS = ("entry_timestamp", "exit_timestamp", "created_at")
+
+SYMBOL_ERROR = "Symbol is required."
+DIRECTION_ERROR = "Direction must be 'Long' or 'Short'."
+PRICE_ERROR = "Entry Price, Exit Price, and Size must be greater than zero."
+NUMERIC_ERRORS = {
+    "entry_price": PRICE_ERROR,
+    "exit_price": PRICE_ERROR,
+    "size": PRICE_ERROR,
+    "fees": "Fees cannot be negative.",
+}
+TIMESTAMP_ERROR = "Timestamps must be dates and times."
+ORDER_ERROR = "Exit Timestamp must be after Entry Timestamp."
+NOTES_ERROR = "Notes must be text."
+
+
+def is_number(value) -> bool:
+    """
+    Returns True for int and float values. bool is an int subclass and
+    numeric strings such as "100" are not accepted as numbers.
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def normalize_symbol(value) -> str:
+    """
+    Returns the trimmed, upper-case symbol, or "" if value is not text.
+    """
+    return value.strip().upper() if isinstance(value, str) else ""
+
+
+def in_range(values, zero_allowed, isfinite=math.isfinite):
+    """
+    The range rule for numeric fields (see NUMERIC_RULES), for a number or,
+    with isfinite=np.isfinite, a float array. NaN and inf are out of range.
+    """
+    return isfinite(values) & ((values >= 0) if zero_allowed else (values > 0))
+
+
+def compute_pnl(is_long_trade: bool, entry_price: float, exit_price: float,
+                size: float) -> float:
+    """
+    Calculates the gross P&L of a trade (before fees).
+    Accepts scalars or numpy arrays of equal length for bulk calculations.
+    """
+    pnl = (exit_price - entry_price) * size
+    if isinstance(pnl, np.ndarray):
+        return np.where(is_long_trade, pnl, -pnl)
+    return pnl if is_long_trade else -pnl  # Reverse P&L for short trades
+
+
+@dataclass(slots=True)
+class Trade:
+    """
+    A closed round-trip trade, as stored in the 'journal_entries' collection.
+    Validates its fields on creation and computes P&L from prices and size.
+    """
+    symbol: str
+    direction: str
+    entry_price: float
+    exit_price: float
+    size: float
+    entry_timestamp: datetime | None = None
+    exit_timestamp: datetime | None = None
+    notes: str = ""
+    fees: float = 0.0
+    id: str | None = None
+    created_at: datetime | None = None
+
+    def __post_init__(self):
+        self.symbol = normalize_symbol(self.symbol)
+        if not self.symbol:
+            raise ValueError(SYMBOL_ERROR)
+        if self.direction not in DIRECTIONS:
+            raise ValueError(DIRECTION_ERROR)
+        for name, zero_allowed in NUMERIC_RULES.items():
+            value = getattr(self, name)
+            if not (is_number(value) and in_range(value, zero_allowed)):
+                raise ValueError(NUMERIC_ERRORS[name])
+        for name in TIMESTAMP_FIELDS:
+            if not isinstance(getattr(self, name), (datetime, type(None))):
+                raise ValueError(TIMESTAMP_ERROR)
+        if self.entry_timestamp and self.exit_timestamp and \
+           self.exit_timestamp < self.entry_timestamp:
+            raise ValueError(ORDER_ERROR)
+        if not isinstance(self.notes, str):
+            raise ValueError(NOTES_ERROR)
+
+    @property
+    def is_long(self) -> bool:
+        return self.direction == "Long"
+
+    @property
+    def pnl(self) -> float:
+        return compute_pnl(self.is_long, self.entry_price, self.exit_price,
+                           self.size)
+
+    @property
+    def net_pnl(self) -> float:
+        return self.pnl - self.fees
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "Trade":
+        """
+        Builds a Trade from a journal entry dictionary. A stored 'pnl' value
+        is ignored and recomputed.
+        """
+        return cls(
+            symbol=entry.get("symbol"),
+            direction=entry.get("direction"),
+            entry_price=entry.get("entry_price"),
+            exit_price=entry.get("exit_price"),
+            size=entry.get("size"),
+            entry_timestamp=entry.get("entry_timestamp"),
+            exit_timestamp=entry.get("exit_timestamp"),
+            notes=entry.get("notes") or "",
+            fees=entry.get("fees") or 0.0,
+            id=entry.get("id"),
+            created_at=entry.get("created_at"),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Returns the journal entry document for this trade, including 'pnl'.
+        The 'id' and 'created_at' fields are managed by Firestore and
+        left out.
+        """
+        entry = {
+            "symbol": self.symbol,
+            "direction": self.direction,
+            "entry_price": self.entry_price,
+            "exit_price": self.exit_price,
+            "size": self.size,
+            "pnl": self.pnl,
+            "notes": self.notes,
+        }
+        if self.fees:
+            entry["fees"] = self.fees
+        if self.entry_timestamp is not None:
+            entry["entry_timestamp"] = self.entry_timestamp
+        if self.exit_timestamp is not None:
+            entry["exit_timestamp"] = self.exit_timestamp
+        return entry
+
+
+def trades_from_entries(entries):
+    """
+    Converts journal entry dictionaries into Trade objects, skipping entries
+    that fail validation.
+    Returns:
+        tuple: (list of Trade, number of skipped entries)
+    """
+    trades = []
+    skipped = 0
+    for entry in entries:
+        try:
+            trades.append(Trade.from_dict(entry))
+        except (TypeError, ValueError):
+            skipped += 1
+    return trades, skipped
+
+
+def _naive_utc(value):
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def trades_to_records(trades) -> np.ndarray:
+    """
+    Packs trades into a numpy structured array (see TRADE_DTYPE), one
+    fixed-size row per trade. Timestamps are stored as naive UTC.
+    """
+    records = np.empty(len(trades), dtype=TRADE_DTYPE)
+    records["symbol"] = [t.symbol for t in trades]
+    records["is_long"] = [t.direction == "Long" for t in trades]
+    records["entry_price"] = [t.entry_price for t in trades]
+    records["exit_price"] = [t.exit_price for t in trades]
+    records["size"] = [t.size for t in trades]
+    records["fees"] = [t.fees for t in trades]
+    records["pnl"] = compute_pnl(records["is_long"], records["entry_price"],
+                                 records["exit_price"], records["size"])
+    records["entry_timestamp"] = np.array(
+        [_naive_utc(t.entry_timestamp) for t in trades], dtype="datetime64[us]")
+    records["exit_timestamp"] = np.array(
+        [_naive_utc(t.exit_timestamp) for t in trades], dtype="datetime64[us]")
+    return records
+
+
+def trades_to_arrow(trades) -> pa.Table:
+    """
+    Converts trades into an Arrow table (see TRADE_ARROW_SCHEMA) with
+    dictionary-encoded symbol and direction columns. Use .to_pandas() on the
+    result to get a DataFrame.
+    """
+    columns = {
+        name: [getattr(t, name) for t in trades]
+        for name in TRADE_ARROW_SCHEMA.names if name != "pnl"
+    }
+    columns["pnl"] = compute_pnl(
+        np.array([d == "Long" for d in columns["direction"]], dtype=bool),
+        np.array(columns["entry_price"], dtype="f8"),
+        np.array(columns["exit_price"], dtype="f8"),
+        np.array(columns["size"], dtype="f8"))
+    return pa.table(columns, schema=TRADE_ARROW_SCHEMA)
+
+
+def entry_columns(entries, columns=None):
+    """
+    Collects the ENTRY_FIELDS of journal entry dictionaries into one list of
+    values per field, appending to `columns` when given (e.g. page by page).
+    Returns:
+        dict: Field name -> list of values, for entries_to_arrow.
+    """
+    if columns is None:
+        columns = {name: [] for name in ENTRY_FIELDS}
+    for name in ENTRY_FIELDS:
+        columns[name].extend([entry.get(name) for entry in entries])
+    return columns
+
+
+def _number_column(values, default=None):
+    # Missing values become `default`; anything else that is not a number
+    # becomes NaN, which fails in_range
+    if set(map(type, values)) <= {float, int, type(None)}:
+        column = pa.array(values, pa.float64())
+    else:
+        column = pa.array([v if is_number(v) or v is None else np.nan
+                           for v in values], pa.float64())
+    if default is not None:
+        column = column.fill_null(default)
+    return column.to_numpy(zero_copy_only=False)
+
+
+def _string_column(values, default=None):
+    # Returns the column and a mask of the values that were text (or
+    # missing, when a default is given)
+    try:
+        column = pa.array(values, pa.string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        ok = np.array([isinstance(v, str) or (default is not None and not v)
+                       for v in values], dtype=bool)
+        column = pa.array([v if isinstance(v, str) else None for v in values],
+                          pa.string())
+    else:
+        ok = np.ones(len(column), dtype=bool)
+    if default is not None:
+        column = column.fill_null(default)
+    return column, ok
+
+
+def _timestamp_column(values):
+    # Type-checked once per distinct type, not per value
+    types = set(map(type, values))
+    if all(t is type(None) or issubclass(t, datetime) for t in types):
+        ok = np.ones(len(values), dtype=bool)
+    else:
+        ok = np.array([isinstance(v, (datetime, type(None))) for v in values],
+                      dtype=bool)
+        values = [v if v_ok else None for v, v_ok in zip(values, ok)]
+    timestamp_type = TRADE_ARROW_SCHEMA.field("created_at").type
+    if types <= {type(None)}:
+        return pa.nulls(len(values), timestamp_type), ok
+    try:
+        # Faster than pa.array on timezone-aware datetimes
+        column = pa.array(pd.to_datetime(values, utc=True).as_unit("us"))
+    except pd.errors.OutOfBoundsDatetime:
+        column = pa.array(values, timestamp_type)
+    return column, ok
+
+
+def entries_to_arrow(entries=None, columns=None):
+    """
+    Converts journal entries into an Arrow table (see TRADE_ARROW_SCHEMA)
+    column by column, without creating a Trade per entry. Entries that
+    Trade.from_dict would reject are skipped, checked with the same rules
+    applied to whole columns, and P&L is recomputed with compute_pnl.
+    Args:
+        entries (list, optional): Journal entry dictionaries.
+        columns (dict, optional): Values per field from entry_columns,
+                                  instead of entries.
+    Returns:
+        tuple: (pa.Table, number of skipped entries)
+    """
+    if columns is None:
+        columns = entry_columns(entries or [])
+
+    symbol, valid = _string_column(columns["symbol"], default="")
+    symbol = pc.utf8_upper(pc.utf8_trim_whitespace(symbol))
+    valid &= pc.not_equal(symbol, "").to_numpy(zero_copy_only=False)
+
+    direction, ok = _string_column(columns["direction"])
+    is_long = pc.equal(direction, "Long").fill_null(False).to_numpy(
+        zero_copy_only=False)
+    valid &= ok & pc.is_in(direction, pa.array(DIRECTIONS)).fill_null(
+        False).to_numpy(zero_copy_only=False)
+
+    numbers = {}
+    for name, zero_allowed in NUMERIC_RULES.items():
+        # Missing fees mean no fees, as in Trade.from_dict
+        numbers[name] = _number_column(columns[name],
+                                       0.0 if name == "fees" else None)
+        valid &= in_range(numbers[name], zero_allowed, isfinite=np.isfinite)
+
+    timestamps = {}
+    for name in TIMESTAMP_FIELDS:
+        timestamps[name], ok = _timestamp_column(columns[name])
+        valid &= ok
+    exits_early = pc.less(timestamps["exit_timestamp"],
+                          timestamps["entry_timestamp"]).fill_null(False)
+    valid &= ~exits_early.to_numpy(zero_copy_only=False)
+
+    notes, ok = _string_column(columns["notes"], default="")
+    valid &= ok
+    ids, _ = _string_column(columns["id"])
+
+    table = pa.table({
+        "id": ids,
+        "symbol": symbol.dictionary_encode(),
+        "direction": direction.dictionary_encode(),
+        **numbers,
+        "pnl": compute_pnl(is_long, numbers["entry_price"],
+                           numbers["exit_price"], numbers["size"]),
+        **timestamps,
+        "notes": notes,
+    }).select(TRADE_ARROW_SCHEMA.names).cast(TRADE_ARROW_SCHEMA)
+    skipped = int(len(valid) - valid.sum())
+    if skipped:
+        table = table.filter(pa.array(valid))
+    return table, skipped
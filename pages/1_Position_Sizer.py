@@ -1,4 +1,6 @@
+import pandas as pd
 import streamlit as st
+from core.indicators import STOP_METHODS, suggest_stop
 from core.position_sizer import calculate_position_size
 
 st.set_page_config(page_title="Position Sizer")
@@ -22,13 +24,79 @@ risk_percentage = st.slider(
 entry_price = st.number_input(
     "Entry Price ($)", min_value=0.01, value=100.00, step=0.01
 )
+# Keyed so a suggested stop can be applied from the section below
+st.session_state.setdefault("stop_loss_price", 99.00)
 stop_loss_price = st.number_input(
-    "Stop Loss Price ($)", min_value=0.01, value=99.00, step=0.01
+    "Stop Loss Price ($)", min_value=0.01, step=0.01, key="stop_loss_price"
 )
 trade_direction = st.radio("Trade Direction", ("Long", "Short"))
 
 is_long_trade = trade_direction == "Long"
 
+
+def use_suggested_stop(stop):
+    st.session_state["stop_loss_price"] = stop
+
+
+with st.expander("Suggest Stop from Recent Bars"):
+    bars_file = st.file_uploader(
+        "Bars CSV", type=["csv"],
+        help="Recent OHLC bars, oldest first, with high, low and close columns."
+    )
+    stop_method = st.radio("Stop Method", STOP_METHODS, horizontal=True)
+    if stop_method == "ATR":
+        atr_period = st.number_input("ATR Period", min_value=1, value=14, step=1)
+        atr_multiplier = st.number_input(
+            "ATR Multiplier", min_value=0.1, value=2.0, step=0.1
+        )
+        channel_window = 20
+    else:
+        channel_window = st.number_input(
+            "Channel Window (bars)", min_value=1, value=20, step=1
+        )
+        atr_period, atr_multiplier = 14, 2.0
+
+    if bars_file is not None:
+        try:
+            bars = pd.read_csv(bars_file).rename(columns=str.lower)
+            suggested_stop = round(
+                suggest_stop(
+                    bars["high"].to_numpy(),
+                    bars["low"].to_numpy(),
+                    bars["close"].to_numpy(),
+                    entry_price=entry_price,
+                    is_long_trade=is_long_trade,
+                    method=stop_method,
+                    atr_period=int(atr_period),
+                    atr_multiplier=atr_multiplier,
+                    channel_window=int(channel_window),
+                ),
+                2,
+            )
+            suggested = calculate_position_size(
+                account_balance=account_balance,
+                risk_percentage=risk_percentage,
+                entry_price=entry_price,
+                stop_loss_price=suggested_stop,
+                is_long_trade=is_long_trade,
+            )
+        except KeyError as e:
+            st.error(f"Error: Bars CSV is missing the column {e}.")
+        except ValueError as e:
+            st.error(f"Error: {e}")
+        else:
+            col1, col2 = st.columns(2)
+            col1.metric("Suggested Stop", f"${suggested_stop:.2f}")
+            col2.metric(
+                "Suggested Position Size",
+                f"{suggested['position_size_units']:.2f}",
+            )
+            st.button(
+                "Use Suggested Stop",
+                on_click=use_suggested_stop,
+                args=(suggested_stop,),
+            )
+
 if st.button("Calculate Position Size"):
     try:
         result = calculate_position_size(
@@ -1,6 +1,20 @@
+import io
 import streamlit as st
 from datetime import datetime, time, timezone
-from core.firestore_utils import init_firestore_client, add_trade_entry
+from core.firestore_utils import (
+    init_firestore_client,
+    add_trade_entry,
+    add_trade_entries,
+    select_account
+)
+from core.lot_matcher import (
+    MATCHING_METHODS,
+    iter_fills_csv,
+    match_fills,
+    round_trip_id
+)
+from core.notes_index import NOTES_INDEX_PATH, get_notes_index
+from core.trade import Trade
 
 st.set_page_config(page_title="Journal", page_icon="✍️")
 
@@ -10,6 +24,8 @@ st.markdown("Record your trades and track your performance.")
 db = init_firestore_client()
 
 if db:
+    account_id = select_account(db)
+
     with st.form("trade_entry_form"):
         st.header("New Trade Entry")
 
@@ -47,41 +63,34 @@ if db:
         submitted = st.form_submit_button("Add Trade Entry")
 
         if submitted:
-            # Input Validation
             # Combine date and time for timestamps
             entry_timestamp = datetime.combine(entry_date, entry_time,
                                                tzinfo=timezone.utc)
             exit_timestamp = datetime.combine(exit_date, exit_time,
                                               tzinfo=timezone.utc)
 
-            # Input Validation
-            if not symbol:
-                st.error("Symbol is required.")
-            elif (entry_price <= 0 or exit_price <= 0 or size <= 0):
-                st.error("Entry Price, Exit Price, and Size must be greater than zero.")
-            elif entry_timestamp >= exit_timestamp:
-                st.error("Exit Timestamp must be after Entry Timestamp.")
+            try:
+                trade = Trade(
+                    symbol=symbol,
+                    direction=direction,
+                    entry_price=entry_price,
+                    exit_price=exit_price,
+                    size=size,
+                    notes=notes,
+                    entry_timestamp=entry_timestamp,
+                    exit_timestamp=exit_timestamp
+                )
+            except ValueError as e:
+                st.error(str(e))
             else:
-                # Calculate P&L
-                pnl = (exit_price - entry_price) * size
-                if direction == "Short":  # Reverse P&L for short trades
-                    pnl = -pnl
-
-                trade_data = {
-                    "symbol": symbol.upper(),
-                    "direction": direction,
-                    "entry_price": entry_price,
-                    "exit_price": exit_price,
-                    "size": size,
-                    "pnl": pnl,
-                    "notes": notes,
-                    "entry_timestamp": entry_timestamp,
-                    "exit_timestamp": exit_timestamp
-                }
-
-                trade_doc_id = add_trade_entry(db, trade_data)
+                trade_data = trade.to_dict()
+                trade_doc_id = add_trade_entry(db, trade_data,
+                                               account_id=account_id)
                 if trade_doc_id:
-                    st.success(f"Trade for {symbol.upper()} (ID: {trade_doc_id}) "
+                    notes_index = get_notes_index()
+                    notes_index.add(trade_doc_id, trade_data)
+                    notes_index.save(NOTES_INDEX_PATH)
+                    st.success(f"Trade for {trade.symbol} (ID: {trade_doc_id}) "
                                "added successfully!")
                     # Clear form fields (requires re-running the script, which
                     # happens on successful form submission in Streamlit)
@@ -89,6 +98,36 @@ if db:
                     # or manage state more explicitly, but for now, the form
                     # will reset on next interaction.
                 # No else block needed, as add_trade_entry already handles errors.
+
+    with st.expander("Import Broker Fills"):
+        st.markdown("Upload a CSV of raw fills (columns: symbol, side, quantity, "
+                    "price, timestamp, fee). Partial fills, scale-ins and "
+                    "scale-outs are matched into round-trip trades.")
+        fills_file = st.file_uploader("Fills CSV", type=["csv"])
+        method = st.radio("Lot Matching", MATCHING_METHODS, horizontal=True)
+
+        if fills_file is not None and st.button("Import Trades"):
+            fills = iter_fills_csv(io.TextIOWrapper(fills_file, encoding="utf-8"))
+            # Match the whole file before writing anything, so a bad row
+            # cannot leave a partial import behind
+            try:
+                trades = list(match_fills(fills, method=method))
+            except (KeyError, ValueError) as e:
+                st.error(f"Error reading fills: {e} Nothing was imported.")
+            else:
+                entries = {}
+                for trade in trades:
+                    trade.notes = f"Imported from broker fills ({method})."
+                    entries[round_trip_id(trade, method)] = trade.to_dict()
+                # Fixed IDs make re-importing the same fills overwrite them
+                written = add_trade_entries(db, list(entries.items()),
+                                            account_id=account_id)
+                notes_index = get_notes_index()
+                for trade_doc_id in written:
+                    notes_index.add(trade_doc_id, entries[trade_doc_id])
+                notes_index.save(NOTES_INDEX_PATH)
+                if len(written) == len(entries):
+                    st.success(f"Imported {len(written)} round-trip trades.")
 else:
     st.warning("Firestore client not initialized. "
                "Please check your GCP credentials setup.")
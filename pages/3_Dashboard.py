@@ -1,22 +1,80 @@
+import altair as alt
 import streamlit as st
-import pandas as pd
-from datetime import timezone
-from core.firestore_utils import init_firestore_client, get_trade_entries
+from datetime import datetime, timedelta, timezone
+from core.analytics import (
+    DIMENSIONS,
+    METRICS,
+    TradeCube,
+    dimension_labels,
+    get_trade_cube
+)
+from core.export import EXPORT_FORMATS, export_to_tempfile
+from core.firestore_utils import (
+    init_firestore_client,
+    get_trade_table,
+    iter_trade_entry_pages,
+    select_account
+)
+from core.notes_index import NOTES_INDEX_PATH, get_notes_index
+from core.resilience import get_metrics
 
 st.set_page_config(page_title="Dashboard", page_icon="📈")
 
+ANALYTICS_TIMEZONES = ["UTC", "America/New_York", "Europe/London", "Asia/Tokyo"]
+# Display labels, in the order of METRICS
+METRIC_LABELS = {"pnl": "P&L", "win_rate": "Win Rate (%)",
+                 "expectancy": "Expectancy (P&L per trade)", "count": "Trades"}
+
 st.title("📈 Trade Dashboard")
 st.markdown("Overview of your trade performance.")
 
 db = init_firestore_client()
 
 if db:
+    account_id = select_account(db)
+
     st.header("Recent Trades")
-    trades = get_trade_entries(db)
+    trades, skipped = get_trade_table(db, account_id=account_id)
+    if skipped:
+        st.warning(f"Skipped {skipped} journal entries with invalid fields.")
+
+    with st.sidebar.expander("Backend Health"):
+        metrics = get_metrics()
+        st.metric("Circuit Breaker", metrics["breaker_state"].replace("_", " "))
+        st.caption(f"Calls: {metrics.get('calls', 0)} · "
+                   f"Retries: {metrics.get('retries', 0)} · "
+                   f"Failures: {metrics.get('failures', 0)} · "
+                   f"Timeouts: {metrics.get('deadline_exceeded', 0)} · "
+                   f"Short-circuited: {metrics.get('short_circuits', 0)} · "
+                   f"Served from cache: {metrics.get('cache_hits', 0)}")
+
+    if trades.num_rows:
+        # Keep the local notes index in sync with the journal
+        notes_index = get_notes_index()
+        if notes_index.sync_table(trades):
+            notes_index.save(NOTES_INDEX_PATH)
 
-    if trades:
-        # Convert list of dicts to DataFrame
-        df = pd.DataFrame(trades)
+        df = trades.to_pandas()
+
+        # Fold new trades into the analytics cube before the table is filtered
+        # and formatted; slicing it below never regroups the raw trades
+        analytics_tz = st.session_state.get("analytics_tz", "UTC")
+        trade_cube = get_trade_cube(account_id, analytics_tz)
+        trade_cube.sync(df)
+
+        search_query = st.text_input(
+            "Search Notes",
+            placeholder="e.g., #fomo TSLA, #breakout, earnings",
+            help="Use #tag for tags, TICKER or symbol:TICKER for symbols, "
+                 "and plain words to search notes. All parts must match.")
+        if search_query:
+            matching_ids = notes_index.search(search_query)
+            df = df[df["id"].isin(matching_ids)]
+            st.caption(f"{len(df)} trades match '{search_query}'.")
+            # Edge analysis covers only the matching trades; the shared cube
+            # holds the whole journal, so aggregate the matches on their own
+            trade_cube = TradeCube(analytics_tz)
+            trade_cube.add(df)
 
         # Format timestamps for better readability
         if 'created_at' in df.columns:
@@ -53,6 +111,97 @@ if db:
         with col3:
             st.metric("Win Rate", f"{win_rate:.2f}%")
 
+        st.header("Edge Analysis")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            rows = st.selectbox("Rows", DIMENSIONS, index=2)
+        with col2:
+            column_options = [d for d in DIMENSIONS if d != rows]
+            columns = st.selectbox("Columns", column_options,
+                                   index=len(column_options) - 1)
+        with col3:
+            metric_label = st.selectbox("Metric", list(METRIC_LABELS.values()))
+            metric = METRICS[list(METRIC_LABELS.values()).index(metric_label)]
+        with col4:
+            st.selectbox("Time Zone", ANALYTICS_TIMEZONES, key="analytics_tz")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            cube_symbols = trade_cube.rollup(("symbol",)).index.tolist()
+            analytics_symbol = st.selectbox("Symbol", ["All"] + cube_symbols)
+        with col2:
+            analytics_direction = st.radio("Direction", ["All", "Long", "Short"],
+                                           horizontal=True)
+        filters = {}
+        if analytics_symbol != "All":
+            filters["symbol"] = analytics_symbol
+        if analytics_direction != "All":
+            filters["direction"] = analytics_direction
+
+        pivot = trade_cube.pivot(rows, columns, metric, filters)
+        heatmap_tab, pivot_tab, rollup_tab = st.tabs(
+            ["Heatmap", "Pivot Table", f"By {rows.capitalize()}"])
+        with heatmap_tab:
+            cells = pivot.stack().rename(metric).reset_index()
+            color_mid = {"pnl": 0, "expectancy": 0, "win_rate": 50}.get(metric)
+            heatmap = alt.Chart(cells).mark_rect().encode(
+                x=alt.X(f"{columns}:O", sort=list(pivot.columns),
+                        title=columns.capitalize()),
+                y=alt.Y(f"{rows}:O", sort=list(pivot.index),
+                        title=rows.capitalize()),
+                color=alt.Color(f"{metric}:Q", title=METRIC_LABELS[metric],
+                                scale=alt.Scale(scheme="redyellowgreen",
+                                                domainMid=color_mid)),
+                tooltip=[rows, columns,
+                         alt.Tooltip(f"{metric}:Q", format=",.2f",
+                                     title=METRIC_LABELS[metric])])
+            st.altair_chart(heatmap, use_container_width=True)
+        with pivot_tab:
+            st.dataframe(pivot)
+        with rollup_tab:
+            rollup = trade_cube.rollup((rows,), filters)[list(METRICS)]
+            rollup.index = dimension_labels(rows, rollup.index)
+            st.dataframe(rollup.rename(columns=METRIC_LABELS))
+
+        st.header("Export")
+        with st.form("export_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                export_format = st.selectbox("Format", EXPORT_FORMATS)
+                export_symbol = st.text_input("Symbol (optional)")
+            with col2:
+                use_dates = st.checkbox("Filter by entry date")
+                date_range = st.date_input(
+                    "Entry Date Range",
+                    value=(datetime.now(timezone.utc).date() - timedelta(days=30),
+                           datetime.now(timezone.utc).date()))
+            prepared = st.form_submit_button("Prepare Export")
+
+        if prepared:
+            start = end = None
+            if use_dates and len(date_range) == 2:
+                start = datetime.combine(date_range[0], datetime.min.time(),
+                                         tzinfo=timezone.utc)
+                end = datetime.combine(date_range[1] + timedelta(days=1),
+                                       datetime.min.time(), tzinfo=timezone.utc)
+            pages = iter_trade_entry_pages(db, symbol=export_symbol or None,
+                                           start=start, end=end,
+                                           account_id=account_id)
+            try:
+                export_file, count = export_to_tempfile(pages, export_format)
+            except Exception as e:
+                st.error(f"Error exporting trade entries: {e}")
+            else:
+                # Pass the spooled file rather than a copy of its bytes; the
+                # unbuffered file is a type the download button accepts
+                with export_file:
+                    st.download_button(
+                        f"Download {count} trades",
+                        data=export_file.raw,
+                        file_name=f"journal_entries.{export_format}",
+                        mime="text/csv" if export_format == "csv"
+                        else "application/octet-stream")
+
     else:
         st.info("No trade entries found. Add some trades using the 'Journal' page.")
 else:
@@ -0,0 +1,298 @@
+"""
+In-memory stand-in for the parts of the Firestore client the app uses, for
+tests, load tests and benchmarks that should not touch the cloud.
+
+Supports collections and subcollections, add/set/get/delete, write batches,
+where/order_by/limit/start_after queries and SERVER_TIMESTAMP. Every backend
+call is counted in `calls` and can be slowed down with an injected `latency`
+(seconds), to mimic a remote backend. A call given a `timeout` shorter than
+the latency raises DeadlineExceeded after the timeout, and `fail_next` makes
+the next calls raise an error, to mimic an unhealthy backend.
+"""
+import bisect
+import functools
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from google.api_core import exceptions as api_exceptions
+from google.cloud import firestore
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+}
+
+
+class FakeFirestore:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self._data = {}  # collection path -> {document id: dict}
+        self._lock = threading.Lock()
+        self._last_timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self._failures = []
+        # Sorted query results, reused while no document changes, so
+        # paginating a large collection does not re-sort it for every page
+        self._version = 0
+        self._query_cache = {}
+
+    def fail_next(self, error, times=1):
+        """
+        Makes the next `times` backend calls raise `error` (an exception
+        instance) instead of running.
+        """
+        with self._lock:
+            self._failures.extend([error] * times)
+
+    def _call(self, operation, timeout=None):
+        with self._lock:
+            self.calls[operation] += 1
+            error = self._failures.pop(0) if self._failures else None
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise api_exceptions.DeadlineExceeded(f"{operation} timed out")
+        if self.latency:
+            time.sleep(self.latency)
+        if error is not None:
+            raise error
+
+    def _server_timestamp(self):
+        # Strictly increasing, like created_at values in a busy journal
+        with self._lock:
+            now = max(datetime.now(timezone.utc),
+                      self._last_timestamp + timedelta(microseconds=1))
+            self._last_timestamp = now
+            return now
+
+    def _resolve(self, data):
+        return {
+            key: self._server_timestamp()
+            if value is firestore.SERVER_TIMESTAMP else value
+            for key, value in data.items()
+        }
+
+    def _write(self, path, doc_id, data, merge=False):
+        data = self._resolve(data)
+        with self._lock:
+            docs = self._data.setdefault(path, {})
+            if merge and doc_id in docs:
+                docs[doc_id].update(data)
+            else:
+                docs[doc_id] = data
+            self._version += 1
+
+    def _delete(self, path, doc_id):
+        with self._lock:
+            self._data.get(path, {}).pop(doc_id, None)
+            self._version += 1
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def document_count(self, path):
+        return len(self._data.get(path, {}))
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return None if self._data is None else dict(self._data)
+
+    def get(self, field):
+        return self._data[field]
+
+
+class FakeDocumentReference:
+    def __init__(self, client, collection_path, doc_id):
+        self._client = client
+        self._collection_path = collection_path
+        self.id = doc_id
+        self.path = f"{collection_path}/{doc_id}"
+
+    def collection(self, name):
+        return FakeCollection(self._client, f"{self.path}/{name}")
+
+    def set(self, data, merge=False, timeout=None, **kwargs):
+        self._client._call("set", timeout)
+        self._client._write(self._collection_path, self.id, data, merge=merge)
+
+    def get(self, timeout=None, **kwargs):
+        self._client._call("get", timeout)
+        data = self._client._data.get(self._collection_path, {}).get(self.id)
+        return FakeDocumentSnapshot(self, None if data is None else dict(data))
+
+    def delete(self, timeout=None, **kwargs):
+        self._client._call("delete", timeout)
+        self._client._delete(self._collection_path, self.id)
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(("set", reference, data, merge))
+
+    def delete(self, reference):
+        self._writes.append(("delete", reference, None, False))
+
+    def commit(self, timeout=None, **kwargs):
+        if len(self._writes) > 500:
+            raise ValueError("A write batch can contain at most 500 operations.")
+        self._client._call("commit", timeout)
+        for operation, reference, data, merge in self._writes:
+            if operation == "set":
+                self._client._write(reference._collection_path, reference.id,
+                                    data, merge=merge)
+            else:
+                self._client._delete(reference._collection_path, reference.id)
+        self._writes = []
+
+
+class FakeQuery:
+    def __init__(self, client, path, filters=(), orders=(), limit=None,
+                 cursor=None):
+        self._client = client
+        self._path = path
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._cursor = cursor
+
+    def _copy(self, **changes):
+        fields = dict(filters=self._filters, orders=self._orders,
+                      limit=self._limit, cursor=self._cursor)
+        fields.update(changes)
+        return FakeQuery(self._client, self._path, **fields)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = \
+                filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=firestore.Query.ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot):
+        return self._copy(cursor=snapshot)
+
+    def _compare(self, orders, a, b):
+        for field, direction in orders:
+            left = a.id if field == "__name__" else a._data[field]
+            right = b.id if field == "__name__" else b._data[field]
+            if left != right:
+                result = -1 if left < right else 1
+                return -result if direction == firestore.Query.DESCENDING \
+                    else result
+        return 0
+
+    def _matches(self, data):
+        for field, op, value in self._filters:
+            if field not in data or not _OPERATORS[op](data[field], value):
+                return False
+        for field, _ in self._orders:
+            if field != "__name__" and field not in data:
+                return False
+        return True
+
+    def _sorted(self, orders):
+        try:
+            key = (self._path, self._filters, tuple(orders))
+            hash(key)
+        except TypeError:  # e.g. an 'in' filter with a list value
+            key = None
+        with self._client._lock:
+            version = self._client._version
+            cached = self._client._query_cache.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            docs = [
+                FakeDocumentSnapshot(
+                    FakeDocumentReference(self._client, self._path, doc_id), data)
+                for doc_id, data in self._client._data.get(self._path, {}).items()
+                if self._matches(data)
+            ]
+        directions = {direction for _, direction in orders}
+        if len(directions) == 1:
+            # Plain tuple keys sort much faster than a comparison function
+            docs.sort(key=lambda doc: tuple(
+                doc.id if field == "__name__" else doc._data[field]
+                for field, _ in orders),
+                reverse=directions == {firestore.Query.DESCENDING})
+        else:
+            docs.sort(key=functools.cmp_to_key(
+                functools.partial(self._compare, orders)))
+        if key is not None:
+            with self._client._lock:
+                self._client._query_cache[key] = (version, docs)
+        return docs
+
+    def stream(self, timeout=None, **kwargs):
+        self._client._call("stream", timeout)
+
+        # Like Firestore, break ties by document ID in the last direction
+        orders = list(self._orders)
+        if not any(field == "__name__" for field, _ in orders):
+            last = orders[-1][1] if orders else firestore.Query.ASCENDING
+            orders.append(("__name__", last))
+        docs = self._sorted(orders)
+
+        start = 0
+        if self._cursor is not None:
+            sort_key = functools.cmp_to_key(
+                functools.partial(self._compare, orders))
+            start = bisect.bisect_right(docs, sort_key(self._cursor),
+                                        key=sort_key)
+        end = len(docs) if self._limit is None else start + self._limit
+        # Copies, so callers cannot change the stored documents
+        return iter([
+            FakeDocumentSnapshot(doc.reference, dict(doc._data))
+            for doc in docs[start:end]
+        ])
+
+    def get(self, **kwargs):
+        return list(self.stream(**kwargs))
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, doc_id=None):
+        return FakeDocumentReference(self._client, self._path,
+                                     doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data, document_id=None, timeout=None, **kwargs):
+        self._client._call("add", timeout)
+        reference = self.document(document_id)
+        with self._client._lock:
+            exists = reference.id in self._client._data.get(self._path, {})
+        if exists:
+            raise api_exceptions.AlreadyExists(f"{reference.path} already exists")
+        self._client._write(self._path, reference.id, data)
+        return self._client._last_timestamp, reference
@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+import pytest
+from core.firestore_utils import (
+    add_trade_entries,
+    add_trade_entry,
+    create_account,
+    get_trade_entries,
+    get_trade_table,
+    iter_trade_entries,
+    journal_collection,
+    list_accounts
+)
+from core.migrate_accounts import migrate_entries
+from tests.fake_firestore import FakeFirestore
+
+
+@pytest.fixture
+def db():
+    # Streamlit messages are irrelevant here; keep them out of the test output
+    with patch("core.firestore_utils.st"):
+        yield FakeFirestore()
+
+
+def entry(symbol, pnl=1.0, **fields):
+    data = {"symbol": symbol, "direction": "Long", "entry_price": 1.0,
+            "exit_price": 1.0 + pnl, "size": 1.0, "pnl": pnl}
+    data.update(fields)
+    return data
+
+
+def test_entries_are_partitioned_by_account(db):
+    add_trade_entry(db, entry("AAPL"))
+    add_trade_entry(db, entry("MSFT"), account_id="funded-50k")
+    add_trade_entry(db, entry("TSLA"), account_id="funded-50k")
+    add_trade_entry(db, entry("NVDA"), account_id="swing")
+
+    assert [e["symbol"] for e in get_trade_entries(db)] == ["AAPL"]
+    assert [e["symbol"] for e in get_trade_entries(
+        db, account_id="funded-50k")] == ["TSLA", "MSFT"]
+    assert [e["symbol"] for e in iter_trade_entries(
+        db, account_id="swing", page_size=1)] == ["NVDA"]
+    assert db.document_count("accounts/funded-50k/journal_entries") == 2
+
+
+def test_get_trade_table_reads_pages_and_skips_invalid(db):
+    for symbol in ("AAPL", "MSFT", "TSLA", "NVDA", "SPY"):
+        add_trade_entry(db, entry(symbol), account_id="funded-50k")
+    add_trade_entry(db, entry("QQQ", size=-1.0), account_id="funded-50k")
+    add_trade_entry(db, entry("IWM"))
+    db.calls.clear()
+    with patch("core.firestore_utils.TABLE_PAGE_SIZE", 2):
+        table, skipped = get_trade_table(db, account_id="funded-50k")
+    # Three full pages, then an empty one ends the read
+    assert db.calls["stream"] == 4
+    assert skipped == 1
+    assert table.column("symbol").to_pylist() == [
+        "SPY", "NVDA", "TSLA", "MSFT", "AAPL"]
+    assert table.column("created_at").null_count == 0
+
+
+def test_add_trade_entries_is_idempotent(db):
+    entries = [(f"id{i}", entry("AAPL", pnl=float(i))) for i in range(5)]
+    with patch("core.firestore_utils.WRITE_BATCH_SIZE", 2):
+        written = add_trade_entries(db, entries, account_id="funded-50k")
+        # Re-importing the same entries overwrites them
+        add_trade_entries(db, [(doc_id, entry("AAPL", pnl=9.0))
+                               for doc_id, _ in entries], account_id="funded-50k")
+    assert written == [f"id{i}" for i in range(5)]
+    assert db.calls["commit"] == 6
+    assert db.document_count("accounts/funded-50k/journal_entries") == 5
+    assert {e["pnl"] for e in get_trade_entries(db, account_id="funded-50k")} == {9.0}
+
+
+def test_account_reads_only_touch_that_account(db):
+    for i in range(50):
+        add_trade_entry(db, entry("SPY"), account_id="big")
+    add_trade_entry(db, entry("QQQ"), account_id="small")
+    db.calls.clear()
+    assert len(get_trade_entries(db, account_id="small")) == 1
+    assert db.calls["stream"] == 1
+
+
+def test_create_and_list_accounts(db):
+    create_account(db, "swing")
+    create_account(db, "funded-50k")
+    create_account(db, "swing")
+    assert list_accounts(db) == ["funded-50k", "swing"]
+
+
+@pytest.mark.parametrize("account_id", ["", "a/b", "Default"])
+def test_invalid_account_id(db, account_id):
+    with pytest.raises(ValueError):
+        journal_collection(db, account_id)
+    with pytest.raises(ValueError):
+        create_account(db, account_id)
+    assert list_accounts(db) == []
+
+
+def test_migrate_entries_to_account(db):
+    for i in range(5):
+        add_trade_entry(db, entry(f"S{i}"))
+    counts = migrate_entries(db, account_id="main", batch_size=2)
+    assert counts == {"main": 5}
+    assert list_accounts(db) == ["main"]
+    assert len(get_trade_entries(db, account_id="main")) == 5
+    # Originals are kept unless asked to delete, and re-running is idempotent
+    assert len(get_trade_entries(db)) == 5
+    migrate_entries(db, account_id="main", batch_size=2)
+    assert db.document_count("accounts/main/journal_entries") == 5
+
+
+def test_migrate_entries_by_field_with_delete(db):
+    add_trade_entry(db, entry("AAPL", account_id="swing"))
+    add_trade_entry(db, entry("MSFT", account_id="funded-50k"))
+    add_trade_entry(db, entry("TSLA"))
+    counts = migrate_entries(db, account_id="main", by_field="account_id",
+                             delete=True)
+    assert counts == {"swing": 1, "funded-50k": 1, "main": 1}
+    assert get_trade_entries(db) == []
+    migrated = get_trade_entries(db, account_id="swing")
+    assert migrated[0]["symbol"] == "AAPL"
+    assert "account_id" not in migrated[0]
+
+
+def test_migrate_entries_by_field_skips_unassigned(db):
+    add_trade_entry(db, entry("TSLA"))
+    assert migrate_entries(db, by_field="account_id", delete=True) == {}
+    assert len(get_trade_entries(db)) == 1
+
+
+def test_migrate_entries_needs_a_target(db):
+    with pytest.raises(ValueError):
+        migrate_entries(db)
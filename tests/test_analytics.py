@@ -0,0 +1,164 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+from core.analytics import (
+    DIMENSIONS,
+    TradeCube,
+    dimension_labels,
+    get_trade_cube,
+    trade_cells
+)
+
+# Monday 2024-01-01
+MONDAY = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def trades(*rows):
+    """
+    rows: (id, symbol, direction, pnl, entry_timestamp)
+    """
+    return pd.DataFrame({
+        "id": [r[0] for r in rows],
+        "symbol": pd.Categorical([r[1] for r in rows]),
+        "direction": pd.Categorical([r[2] for r in rows]),
+        "pnl": [r[3] for r in rows],
+        "entry_timestamp": pd.to_datetime([r[4] for r in rows], utc=True),
+    })
+
+
+@pytest.fixture
+def journal():
+    return trades(
+        ("a", "AAPL", "Long", 100.0, MONDAY + timedelta(hours=14)),
+        ("b", "AAPL", "Long", -50.0, MONDAY + timedelta(hours=14)),
+        ("c", "AAPL", "Short", 30.0, MONDAY + timedelta(days=1, hours=15)),
+        ("d", "TSLA", "Long", -20.0, MONDAY + timedelta(hours=15)),
+        ("e", "TSLA", "Short", 0.0, MONDAY + timedelta(days=4, hours=14)),
+    )
+
+
+def test_trade_cells(journal):
+    cells = trade_cells(journal)
+    assert cells.index.names == list(DIMENSIONS)
+    cell = cells.loc[("AAPL", "Long", 0, 14)]
+    assert cell["count"] == 2
+    assert cell["wins"] == 1
+    assert cell["pnl"] == 50.0
+    assert cell["gross_win"] == 100.0
+    assert cell["gross_loss"] == -50.0
+    assert cells["count"].sum() == len(journal)
+
+
+def test_rollups_match_direct_groupby(journal):
+    cube = TradeCube()
+    assert cube.add(journal) == 5
+    total = cube.rollup().iloc[0]
+    assert total["count"] == 5
+    assert total["pnl"] == 60.0
+    assert total["win_rate"] == pytest.approx(40.0)
+    assert total["expectancy"] == pytest.approx(12.0)
+
+    by_symbol = cube.rollup(["symbol"])
+    expected = journal.groupby("symbol", observed=True)["pnl"].agg(["sum", "count"])
+    assert by_symbol["pnl"].tolist() == expected["sum"].tolist()
+    assert by_symbol["count"].tolist() == expected["count"].tolist()
+
+    by_hour = cube.rollup(["hour"], filters={"direction": "Long"})
+    assert by_hour["pnl"].to_dict() == {14: 50.0, 15: -20.0}
+
+
+def test_incremental_add_equals_full_build(journal):
+    full = TradeCube()
+    full.add(journal)
+    incremental = TradeCube()
+    incremental.add(journal.iloc[:2])
+    incremental.add(journal.iloc[2:])
+    # Already included trades are not counted twice
+    assert incremental.add(journal) == 0
+    for dims in full.levels:
+        pd.testing.assert_frame_equal(incremental.rollup(dims),
+                                      full.rollup(dims), check_dtype=False)
+
+
+def test_sync_adds_new_trades_and_rebuilds_on_removal(journal):
+    cube = TradeCube()
+    assert cube.sync(journal.iloc[:3]) == 3
+    assert cube.sync(journal) == 2
+    assert cube.sync(journal) == 0
+    assert cube.sync(journal.iloc[1:]) == 4
+    assert len(cube) == 4
+    assert cube.rollup().iloc[0]["pnl"] == -40.0
+
+
+def test_get_trade_cube_is_shared_per_account_and_time_zone(journal):
+    cube = get_trade_cube("funded-50k", "UTC")
+    try:
+        assert get_trade_cube("funded-50k", "UTC") is cube
+        assert get_trade_cube("funded-50k", "Asia/Tokyo") is not cube
+        assert get_trade_cube(None, "UTC") is not cube
+        # Sessions syncing the same journal at once add each trade once
+        threads = [threading.Thread(target=cube.sync, args=(journal,))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(cube) == 5
+        assert cube.rollup().iloc[0]["count"] == 5
+    finally:
+        get_trade_cube.clear()
+
+
+def test_time_zone_shifts_weekday_and_hour():
+    df = trades(("a", "SPY", "Long", 1.0, MONDAY + timedelta(hours=2)))
+    cube = TradeCube(tz="America/New_York")
+    cube.add(df)
+    # 02:00 UTC on Monday is 21:00 on Sunday in New York
+    assert cube.rollup(["weekday", "hour"]).index.tolist() == [(6, 21)]
+
+
+def test_missing_timestamp_falls_back_to_created_at():
+    df = trades(("a", "SPY", "Long", 1.0, None), ("b", "SPY", "Long", 1.0, None))
+    df["created_at"] = pd.to_datetime([MONDAY + timedelta(hours=9), None],
+                                      utc=True)
+    cube = TradeCube()
+    cube.add(df)
+    assert cube.rollup(["hour"]).index.tolist() == [-1, 9]
+
+
+def test_pivot(journal):
+    cube = TradeCube()
+    cube.add(journal)
+    table = cube.pivot("weekday", "hour", metric="count")
+    assert table.index.tolist() == ["Mon", "Tue", "Fri"]
+    assert table.columns.tolist() == ["14:00", "15:00"]
+    assert table.loc["Mon", "14:00"] == 2
+    assert np.isnan(table.loc["Tue", "14:00"])
+
+    win_rate = cube.pivot("symbol", "direction", metric="win_rate")
+    assert win_rate.loc["AAPL", "Long"] == 50.0
+    assert win_rate.loc["TSLA", "Short"] == 0.0
+
+    empty = cube.pivot("symbol", "hour", filters={"symbol": "NVDA"})
+    assert empty.empty
+
+
+@pytest.mark.parametrize("args", [
+    ("symbol", "symbol", "pnl"),
+    ("symbol", "month", "pnl"),
+    ("symbol", "hour", "sharpe"),
+])
+def test_pivot_rejects_invalid_arguments(journal, args):
+    cube = TradeCube()
+    cube.add(journal)
+    with pytest.raises(ValueError):
+        cube.pivot(*args)
+
+
+def test_dimension_labels():
+    assert dimension_labels("weekday", [0, 6, -1]) == ["Mon", "Sun", "n/a"]
+    assert dimension_labels("hour", [9, -1]) == ["09:00", "n/a"]
+    assert dimension_labels("symbol", ["AAPL"]) == ["AAPL"]
@@ -0,0 +1,171 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from core.backup import (
+    MANIFEST_NAME,
+    backup_journal,
+    iter_snapshot_documents,
+    restore_journal,
+    shard_ranges,
+    verify_snapshot
+)
+from core.firestore_utils import journal_collection, list_accounts
+from tests.fake_firestore import FakeFirestore, FakeWriteBatch
+
+START = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+
+def seed(db, count, account_id=None):
+    journal = journal_collection(db, account_id)
+    for i in range(count):
+        journal.add({
+            "symbol": f"S{i % 5}",
+            "direction": "Long",
+            "pnl": float(i),
+            "notes": f"#tag note {i}",
+            "entry_timestamp": START + timedelta(minutes=i),
+            # Several entries share a created_at, to exercise shard edges
+            "created_at": START + timedelta(minutes=i // 3),
+        }, document_id=f"doc{i:04d}")
+
+
+def journal_docs(db, account_id=None):
+    return {doc.id: doc.to_dict()
+            for doc in journal_collection(db, account_id).stream()}
+
+
+def test_shard_ranges_cover_range_without_overlap():
+    last = START + timedelta(hours=1)
+    ranges = shard_ranges(START, last, 4)
+    assert len(ranges) == 4
+    assert ranges[0][0] == START
+    assert ranges[-1][1] > last
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert shard_ranges(START, START, 4) == \
+        [(START, START + timedelta(microseconds=1))]
+
+
+def test_backup_and_restore_round_trip(tmp_path):
+    source = FakeFirestore()
+    seed(source, 100)
+    manifest = backup_journal(source, str(tmp_path), shards=4, workers=2,
+                              page_size=7)
+    assert manifest["count"] == 100
+    assert len(manifest["shards"]) == 4
+    assert sum(shard["count"] for shard in manifest["shards"]) == 100
+
+    # Shards are disjoint and every document is backed up exactly once
+    ids = [doc_id for shard in manifest["shards"]
+           for doc_id, _ in iter_snapshot_documents(
+               os.path.join(tmp_path, shard["file"]))]
+    assert sorted(ids) == [f"doc{i:04d}" for i in range(100)]
+
+    target = FakeFirestore()
+    assert restore_journal(target, str(tmp_path), workers=2, batch_size=9) == 100
+    assert journal_docs(target) == journal_docs(source)
+    assert isinstance(journal_docs(target)["doc0000"]["created_at"], datetime)
+
+
+def test_backup_empty_journal(tmp_path):
+    manifest = backup_journal(FakeFirestore(), str(tmp_path))
+    assert manifest["count"] == 0
+    assert restore_journal(FakeFirestore(), str(tmp_path)) == 0
+
+
+def test_backup_refuses_existing_snapshot(tmp_path):
+    db = FakeFirestore()
+    seed(db, 3)
+    backup_journal(db, str(tmp_path))
+    with pytest.raises(ValueError):
+        backup_journal(db, str(tmp_path))
+
+
+def test_backup_and_restore_accounts(tmp_path):
+    source = FakeFirestore()
+    seed(source, 10, account_id="funded-50k")
+    seed(source, 5)
+    manifest = backup_journal(source, str(tmp_path), account_id="funded-50k")
+    assert manifest["count"] == 10
+
+    target = FakeFirestore()
+    restore_journal(target, str(tmp_path))
+    assert list_accounts(target) == ["funded-50k"]
+    assert journal_docs(target, "funded-50k") == \
+        journal_docs(source, "funded-50k")
+    assert journal_docs(target) == {}
+
+    restore_journal(target, str(tmp_path), account_id="swing")
+    assert len(journal_docs(target, "swing")) == 10
+
+
+def test_restore_resumes_after_interruption(tmp_path):
+    source = FakeFirestore()
+    seed(source, 50)
+    backup_journal(source, str(tmp_path), shards=2)
+
+    target = FakeFirestore()
+    commit = FakeWriteBatch.commit
+    commits = []
+
+    def failing_commit(batch, **kwargs):
+        if len(commits) == 3:
+            raise api_exceptions.PermissionDenied("interrupted")
+        commits.append(1)
+        commit(batch, **kwargs)
+
+    with patch.object(FakeWriteBatch, "commit", failing_commit):
+        with pytest.raises(api_exceptions.PermissionDenied):
+            restore_journal(target, str(tmp_path), workers=1, batch_size=10)
+    written = target.document_count("journal_entries")
+    assert 0 < written < 50
+
+    # Only the remaining documents are written on the second run
+    assert restore_journal(target, str(tmp_path), workers=1,
+                           batch_size=10) == 50 - written
+    assert journal_docs(target) == journal_docs(source)
+
+    # Finished: running again writes nothing unless asked to restart
+    assert restore_journal(target, str(tmp_path)) == 0
+    assert restore_journal(target, str(tmp_path), restart=True) == 50
+    assert target.document_count("journal_entries") == 50
+
+
+def test_restore_retries_transient_commit_errors(tmp_path):
+    source = FakeFirestore()
+    seed(source, 5)
+    backup_journal(source, str(tmp_path))
+    target = FakeFirestore()
+    target.fail_next(api_exceptions.ServiceUnavailable("busy"))
+    with patch("core.resilience.random.uniform", return_value=0.0):
+        assert restore_journal(target, str(tmp_path)) == 5
+    assert target.document_count("journal_entries") == 5
+
+
+def test_verify_detects_corruption(tmp_path):
+    db = FakeFirestore()
+    seed(db, 20)
+    manifest = backup_journal(db, str(tmp_path), shards=2)
+    verify_snapshot(str(tmp_path))
+
+    shard_path = os.path.join(tmp_path, manifest["shards"][0]["file"])
+    with gzip.open(shard_path, "at", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "extra", "data": {}}) + "\n")
+    with pytest.raises(ValueError, match="checksum"):
+        verify_snapshot(str(tmp_path))
+    with pytest.raises(ValueError):
+        restore_journal(FakeFirestore(), str(tmp_path))
+
+
+def test_incomplete_snapshot_is_rejected(tmp_path):
+    db = FakeFirestore()
+    seed(db, 5)
+    backup_journal(db, str(tmp_path))
+    os.remove(os.path.join(tmp_path, MANIFEST_NAME))
+    with pytest.raises(ValueError, match="No complete snapshot"):
+        restore_journal(FakeFirestore(), str(tmp_path))
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import socket
+import threading
+from http.client import HTTPConnection
+
+import pytest
+from core.batch_sizer import main, make_server, size_candidates, size_csv
+
+
+def test_size_candidates_with_defaults():
+    results = size_candidates(
+        [
+            {"symbol": "AAPL", "entry_price": 100, "stop_loss_price": 99,
+             "direction": "Long"},
+            {"symbol": "TSLA", "entry_price": "200", "stop_loss_price": "202",
+             "direction": "short", "risk_percentage": "2"},
+            {"symbol": "BAD", "entry_price": 100, "stop_loss_price": 101,
+             "is_long_trade": "true"},
+        ],
+        account_balance=10000,
+        risk_percentage=1,
+    )
+    assert results[0]["symbol"] == "AAPL"
+    assert results[0]["position_size_units"] == 100
+    assert results[0]["total_position_value"] == 10000
+    assert results[0]["error"] is None
+    assert results[1]["position_size_units"] == 100
+    assert results[1]["risk_amount_dollars"] == 200
+    assert results[2]["position_size_units"] is None
+    assert results[2]["error"] == (
+        "For a long trade, stop loss price must be less than entry price.")
+
+
+def test_size_candidates_direction_aliases_and_unknown():
+    results = size_candidates(
+        [
+            {"entry_price": 100, "stop_loss_price": 98, "direction": "Buy"},
+            {"entry_price": 100, "stop_loss_price": 102, "direction": "SELL"},
+            {"entry_price": 100, "stop_loss_price": 102, "direction": "Lng"},
+            {"entry_price": 100, "stop_loss_price": 102, "is_long_trade": "maybe"},
+        ],
+        account_balance=10000,
+        risk_percentage=1,
+    )
+    assert results[0]["position_size_units"] == 50
+    assert results[1]["position_size_units"] == 50
+    for result in results[2:]:
+        assert result["position_size_units"] is None
+        assert result["error"] == "Unknown direction. Use Long or Short."
+
+
+def test_size_candidates_missing_defaults():
+    results = size_candidates([{"entry_price": 100, "stop_loss_price": 99}])
+    assert results[0]["error"] == "Account balance must be a positive number."
+    assert size_candidates([]) == []
+
+
+def test_size_csv_streams_in_chunks():
+    rows = "\n".join(f"S{i},{100 + i},{99 + i},Long" for i in range(25))
+    input_file = io.StringIO(
+        "symbol,entry_price,stop_loss_price,direction\n" + rows + "\n")
+    output_file = io.StringIO()
+    count = size_csv(input_file, output_file, account_balance=10000,
+                     risk_percentage=1, chunk_size=10)
+    assert count == 25
+    results = list(csv.DictReader(io.StringIO(output_file.getvalue())))
+    assert len(results) == 25
+    assert results[24]["symbol"] == "S24"
+    assert float(results[24]["position_size_units"]) == 100
+    assert results[24]["error"] == ""
+
+
+def test_cli_size(tmp_path, capsys):
+    input_path = tmp_path / "candidates.csv"
+    output_path = tmp_path / "sized.csv"
+    input_path.write_text(
+        "symbol,entry_price,stop_loss_price,direction\nAAPL,100,99,Long\n")
+    main(["size", "--input", str(input_path), "--output", str(output_path),
+          "--account-balance", "10000", "--risk-percentage", "1"])
+    results = list(csv.DictReader(output_path.open()))
+    assert float(results[0]["position_size_units"]) == 100
+    assert "Sized 1 candidates." in capsys.readouterr().err
+
+
+@pytest.fixture
+def server():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, body=None):
+    conn = HTTPConnection(*server.server_address, timeout=5)
+    try:
+        conn.request(method, path, body=body,
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_http_size(server):
+    status, payload = request(server, "POST", "/size", json.dumps({
+        "account_balance": 10000,
+        "risk_percentage": 1,
+        "candidates": [
+            {"symbol": "AAPL", "entry_price": 100, "stop_loss_price": 99},
+            {"symbol": "BAD", "entry_price": 100, "stop_loss_price": 100},
+        ],
+    }))
+    assert status == 200
+    assert payload["results"][0]["position_size_units"] == 100
+    assert payload["results"][1]["position_size_units"] is None
+    assert payload["results"][1]["error"].startswith("Risk per unit")
+
+
+def test_http_accepts_candidate_list(server):
+    status, payload = request(server, "POST", "/size", json.dumps([
+        {"account_balance": 10000, "risk_percentage": 1, "entry_price": 100,
+         "stop_loss_price": 101, "direction": "Short"},
+    ]))
+    assert status == 200
+    assert payload["results"][0]["position_size_units"] == 100
+
+
+def test_http_errors(server):
+    assert request(server, "POST", "/size", "not json")[0] == 400
+    assert request(server, "POST", "/size", json.dumps({"candidates": 1}))[0] == 400
+    assert request(server, "POST", "/other", "[]")[0] == 404
+    assert request(server, "GET", "/health") == (200, {"status": "ok"})
+
+
+def test_http_invalid_content_length(server):
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(b"POST /size HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Length: abc\r\n\r\n[]")
+        response = b""
+        while chunk := sock.recv(4096):
+            response += chunk
+    assert response.startswith(b"HTTP/1.1 400")
+    assert b"Invalid Content-Length header." in response
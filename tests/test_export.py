@@ -0,0 +1,142 @@
+import csv
+import io
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pyarrow.parquet as pq
+import pytest
+from core.export import export_csv, export_entries, export_to_tempfile
+from core.firestore_utils import iter_trade_entries, iter_trade_entry_pages
+
+
+def make_entry(i):
+    return {
+        "id": f"doc{i}",
+        "symbol": "AAPL",
+        "direction": "Long",
+        "entry_price": 100.0 + i,
+        "exit_price": 101.0 + i,
+        "size": 10.0,
+        "pnl": 10.0,
+        "notes": f"trade {i}",
+        "entry_timestamp": datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc),
+        "exit_timestamp": datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc),
+    }
+
+
+class FakeQuery:
+    """Minimal stand-in for a Firestore query that supports cursor paging."""
+
+    def __init__(self, docs, calls):
+        self.docs = docs
+        self.calls = calls
+        self._limit = None
+        self._offset = 0
+
+    def _copy(self):
+        query = FakeQuery(self.docs, self.calls)
+        query._limit, query._offset = self._limit, self._offset
+        return query
+
+    def where(self, filter):
+        self.calls.append(("where", filter.field_path, filter.op_string,
+                           filter.value))
+        return self
+
+    def order_by(self, field, direction=None):
+        self.calls.append(("order_by", field))
+        return self
+
+    def limit(self, n):
+        query = self._copy()
+        query._limit = n
+        return query
+
+    def start_after(self, doc):
+        query = self._copy()
+        query._offset = self.docs.index(doc) + 1
+        return query
+
+    def stream(self, **kwargs):
+        self.calls.append(("stream", self._offset))
+        return iter(self.docs[self._offset:self._offset + self._limit])
+
+
+def make_db(n, calls):
+    docs = []
+    for i in range(n):
+        doc = MagicMock()
+        doc.id = f"doc{i}"
+        doc.to_dict.return_value = {"symbol": "AAPL", "pnl": float(i)}
+        docs.append(doc)
+    db = MagicMock()
+    db.collection.return_value = FakeQuery(docs, calls)
+    return db
+
+
+def test_iter_trade_entry_pages_uses_cursors():
+    calls = []
+    db = make_db(5, calls)
+    pages = list(iter_trade_entry_pages(db, page_size=2))
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [e["id"] for page in pages for e in page] == [
+        "doc0", "doc1", "doc2", "doc3", "doc4"
+    ]
+    assert [c for c in calls if c[0] == "stream"] == [
+        ("stream", 0), ("stream", 2), ("stream", 4)
+    ]
+    assert ("order_by", "created_at") in calls
+
+
+def test_iter_trade_entry_pages_pushes_down_filters():
+    calls = []
+    db = make_db(3, calls)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    entries = list(iter_trade_entries(db, symbol="aapl", start=start, end=end))
+    assert len(entries) == 3
+    assert ("where", "symbol", "==", "AAPL") in calls
+    assert ("where", "entry_timestamp", ">=", start) in calls
+    assert ("where", "entry_timestamp", "<", end) in calls
+    assert ("order_by", "entry_timestamp") in calls
+
+
+def test_iter_trade_entry_pages_invalid_page_size():
+    with pytest.raises(ValueError):
+        list(iter_trade_entry_pages(MagicMock(), page_size=0))
+
+
+def test_export_csv():
+    output = io.StringIO()
+    count = export_csv([[make_entry(0), make_entry(1)], [make_entry(2)]], output)
+    assert count == 3
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert [row["id"] for row in rows] == ["doc0", "doc1", "doc2"]
+    assert rows[0]["entry_timestamp"] == "2024-01-02T14:30:00+00:00"
+    assert rows[0]["fees"] == ""
+
+
+def test_export_parquet_writes_one_row_group_per_page():
+    output = io.BytesIO()
+    pages = [[make_entry(0), make_entry(1)], [], [make_entry(2)]]
+    count = export_entries(pages, output, "parquet")
+    assert count == 3
+    output.seek(0)
+    parquet_file = pq.ParquetFile(output)
+    assert parquet_file.num_row_groups == 2
+    table = parquet_file.read()
+    assert table.column("id").to_pylist() == ["doc0", "doc1", "doc2"]
+    assert table.column("entry_price").to_pylist() == [100.0, 101.0, 102.0]
+
+
+def test_export_to_tempfile_csv():
+    export_file, count = export_to_tempfile([[make_entry(0)]], "csv")
+    with export_file:
+        content = export_file.read().decode("utf-8")
+    assert count == 1
+    assert content.splitlines()[0].startswith("id,symbol,direction")
+
+
+def test_export_invalid_format():
+    with pytest.raises(ValueError):
+        export_entries([], io.BytesIO(), "xlsx")
@@ -0,0 +1,151 @@
+import math
+
+import numpy as np
+import pytest
+from core.indicators import (
+    ATR,
+    EMA,
+    SMA,
+    Donchian,
+    RollingMax,
+    RollingMin,
+    Volatility,
+    atr,
+    donchian,
+    ema,
+    sma,
+    suggest_stop,
+    true_range,
+    volatility
+)
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, 300))
+    high = close + rng.uniform(0, 2, 300)
+    low = close - rng.uniform(0, 2, 300)
+    return high, low, close
+
+
+def assert_stream_matches(stream_values, vector_values):
+    for streamed, expected in zip(stream_values, vector_values):
+        if streamed is None:
+            assert math.isnan(expected)
+        else:
+            assert streamed == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_true_range():
+    tr = true_range([10, 12, 11], [9, 10, 8], [9.5, 11.5, 9])
+    assert tr.tolist() == [1.0, 2.5, 3.5]
+
+
+def test_sma_and_ema_values():
+    assert sma([1, 2, 3, 4], 2)[1:].tolist() == [1.5, 2.5, 3.5]
+    assert math.isnan(sma([1, 2, 3, 4], 2)[0])
+    assert ema([1, 3], 3).tolist() == [1.0, 2.0]
+
+
+def test_streaming_matches_vectorized(bars):
+    high, low, close = bars
+
+    stream = SMA(10)
+    assert_stream_matches([stream.update(c) for c in close], sma(close, 10))
+
+    stream = EMA(10)
+    assert_stream_matches([stream.update(c) for c in close], ema(close, 10))
+
+    stream = ATR(14)
+    assert_stream_matches([stream.update(h, lo, c)
+                           for h, lo, c in zip(high, low, close)],
+                          atr(high, low, close, 14))
+
+    stream = Volatility(20)
+    assert_stream_matches([stream.update(c) for c in close],
+                          volatility(close, 20))
+
+    stream = Donchian(20)
+    upper, lower = donchian(high, low, 20)
+    channel = [stream.update(h, lo) for h, lo in zip(high, low)]
+    assert_stream_matches([c and c[0] for c in channel], upper)
+    assert_stream_matches([c and c[1] for c in channel], lower)
+
+
+def test_rolling_extremes_with_monotonic_runs():
+    values = [5, 4, 3, 2, 1, 2, 3, 4, 5, 5, 1]
+    rolling_max = RollingMax(3)
+    rolling_min = RollingMin(3)
+    assert [rolling_max.update(v) for v in values] == [
+        None, None, 5, 4, 3, 2, 3, 4, 5, 5, 5
+    ]
+    assert [rolling_min.update(v) for v in values] == [
+        None, None, 3, 2, 1, 1, 1, 2, 3, 4, 1
+    ]
+
+
+def test_atr_needs_full_period():
+    assert np.isnan(atr([2, 2], [1, 1], [1.5, 1.5], 3)).all()
+
+
+def test_suggest_stop(bars):
+    high, low, close = bars
+    entry = close[-1]
+    current_atr = atr(high, low, close, 14)[-1]
+    assert suggest_stop(high, low, close, entry, True) == \
+        pytest.approx(entry - 2 * current_atr)
+    assert suggest_stop(high, low, close, entry, False, atr_multiplier=1.5) == \
+        pytest.approx(entry + 1.5 * current_atr)
+    assert suggest_stop(high, low, close, entry, True, method="Donchian") == \
+        low[-20:].min()
+    assert suggest_stop(high, low, close, entry, False, method="Donchian") == \
+        high[-20:].max()
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected_error",
+    [
+        ({"method": "Chandelier"}, "Stop method must be one of"),
+        ({"atr_period": 500}, "At least 500 bars are needed for ATR."),
+        ({"method": "Donchian", "channel_window": 500},
+         "At least 500 bars are needed for the channel."),
+        ({"entry_price": 1.0, "method": "Donchian"},
+         "Suggested stop is not beyond the entry price"),
+        ({"entry_price": 0.5, "atr_multiplier": 100.0},
+         "Suggested stop is not a positive price."),
+    ],
+)
+def test_suggest_stop_errors(bars, kwargs, expected_error):
+    high, low, close = bars
+    params = {"entry_price": close[-1], "is_long_trade": True}
+    params.update(kwargs)
+    with pytest.raises(ValueError) as excinfo:
+        suggest_stop(high, low, close, **params)
+    assert expected_error in str(excinfo.value)
+
+
+def test_suggest_stop_rejects_missing_prices(bars):
+    high, low, close = (values.copy() for values in bars)
+    entry = close[-1]
+    low[-1] = np.nan
+    with pytest.raises(ValueError, match="Suggested stop is missing"):
+        suggest_stop(high, low, close, entry, True, method="Donchian")
+    # Short stops only read the highs, which are all present
+    assert suggest_stop(high, low, close, entry, False, method="Donchian") == \
+        high[-20:].max()
+
+
+@pytest.mark.parametrize("column", [0, 1, 2])
+def test_suggest_stop_atr_rejects_missing_bars(bars, column):
+    columns = [values.copy() for values in bars]
+    columns[column][150] = np.nan
+    with pytest.raises(ValueError, match="missing prices for ATR"):
+        suggest_stop(*columns, columns[2][-1], True)
+
+
+def test_invalid_window():
+    with pytest.raises(ValueError):
+        SMA(0)
+    with pytest.raises(ValueError):
+        sma([1, 2], 1.5)
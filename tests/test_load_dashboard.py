@@ -0,0 +1,40 @@
+from benchmarks.load_dashboard import compare_to_baseline, seed_backend
+from core.firestore_utils import get_trade_entries
+
+REPORT = {
+    "p50_ms": 100.0,
+    "p95_ms": 200.0,
+    "p99_ms": 300.0,
+    "calls_per_render": 2.0,
+    "memory_per_session_kib": 900.0,
+    "errors": 0,
+    "first_error": None,
+}
+
+
+def test_compare_to_baseline_within_tolerance():
+    baseline = dict(REPORT, p99_ms=260.0)
+    assert compare_to_baseline(REPORT, baseline, tolerance=0.2) == []
+
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = dict(REPORT, p99_ms=200.0, calls_per_render=1.0)
+    failures = compare_to_baseline(REPORT, baseline, tolerance=0.2)
+    assert len(failures) == 2
+    assert failures[0].startswith("p99_ms: 300.00 > 240.00")
+    assert failures[1].startswith("calls_per_render: 2.00 > 1.20")
+
+
+def test_compare_to_baseline_flags_errors():
+    report = dict(REPORT, errors=3, first_error="boom")
+    assert compare_to_baseline(report, {}, tolerance=0.2) == [
+        "3 renders raised, first: boom"
+    ]
+
+
+def test_seed_backend():
+    db = seed_backend(25, latency=0.0)
+    assert db.calls == {}
+    entries = get_trade_entries(db)
+    assert len(entries) == 25
+    assert db.calls["stream"] == 1
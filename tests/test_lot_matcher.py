@@ -0,0 +1,186 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from core.lot_matcher import iter_fills_csv, match_fills, round_trip_id
+
+T0 = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+
+
+def fill(symbol, side, quantity, price, minutes, fee=0.0):
+    return {
+        "symbol": symbol,
+        "side": side,
+        "quantity": quantity,
+        "price": price,
+        "fee": fee,
+        "timestamp": T0 + timedelta(minutes=minutes),
+    }
+
+
+def test_single_round_trip():
+    trades = list(match_fills([
+        fill("aapl", "Buy", 100, 150.0, 0, fee=1.0),
+        fill("AAPL", "Sell", 100, 155.0, 30, fee=1.0),
+    ]))
+    assert len(trades) == 1
+    trade = trades[0]
+    assert trade.symbol == "AAPL"
+    assert trade.direction == "Long"
+    assert trade.entry_price == 150.0
+    assert trade.exit_price == 155.0
+    assert trade.size == 100
+    assert trade.pnl == 500.0
+    assert trade.fees == pytest.approx(2.0)
+    assert trade.net_pnl == pytest.approx(498.0)
+    assert trade.entry_timestamp == T0
+    assert trade.exit_timestamp == T0 + timedelta(minutes=30)
+
+    entry = trade.to_dict()
+    assert entry["fees"] == pytest.approx(2.0)
+    assert "net_pnl" not in entry
+
+
+def test_scale_in_fifo_vs_lifo():
+    fills = [
+        fill("TSLA", "Buy", 10, 100.0, 0),
+        fill("TSLA", "Buy", 10, 110.0, 5),
+        fill("TSLA", "Sell", 10, 120.0, 10),
+        fill("TSLA", "Sell", 10, 120.0, 15),
+    ]
+
+    # A complete round trip closes every lot, so both methods agree
+    for method in ("FIFO", "LIFO"):
+        trades = list(match_fills(fills, method=method))
+        assert len(trades) == 1
+        assert trades[0].entry_price == pytest.approx(105.0)
+        assert trades[0].exit_price == pytest.approx(120.0)
+        assert trades[0].size == 20
+        assert trades[0].pnl == pytest.approx(300.0)
+        assert trades[0].entry_timestamp == T0
+        assert trades[0].exit_timestamp == T0 + timedelta(minutes=15)
+
+
+def test_open_position_yields_no_trade():
+    fills = [
+        fill("TSLA", "Buy", 10, 100.0, 0),
+        fill("TSLA", "Sell", 4, 120.0, 5),
+    ]
+    assert list(match_fills(fills)) == []
+
+
+def test_partial_close_uses_weighted_entry_price():
+    trades = list(match_fills([
+        fill("MSFT", "Buy", 10, 100.0, 0),
+        fill("MSFT", "Buy", 30, 104.0, 1),
+        fill("MSFT", "Sell", 20, 110.0, 2),
+        fill("MSFT", "Sell", 20, 106.0, 3),
+    ]))
+    assert len(trades) == 1
+    # Entry: 10 @ 100 and 30 @ 104; exit: 20 @ 110 and 20 @ 106
+    assert trades[0].entry_price == pytest.approx(103.0)
+    assert trades[0].exit_price == pytest.approx(108.0)
+    assert trades[0].size == 40
+    assert trades[0].pnl == pytest.approx(200.0)
+    assert trades[0].exit_timestamp == T0 + timedelta(minutes=3)
+
+
+def test_short_trade_and_flip_through_zero():
+    trades = list(match_fills([
+        fill("ES", "Sell", 2, 5000.0, 0),
+        fill("ES", "Buy", 5, 4990.0, 1),
+        fill("ES", "Sell", 3, 5010.0, 2),
+    ]))
+    assert len(trades) == 2
+    assert trades[0].direction == "Short"
+    assert trades[0].size == 2
+    assert trades[0].pnl == pytest.approx(20.0)
+    assert trades[1].direction == "Long"
+    assert trades[1].entry_price == 4990.0
+    assert trades[1].size == 3
+    assert trades[1].pnl == pytest.approx(60.0)
+
+
+def test_fees_are_prorated_across_split_fills():
+    trades = list(match_fills([
+        fill("NQ", "Buy", 4, 100.0, 0, fee=4.0),
+        fill("NQ", "Sell", 2, 101.0, 1, fee=1.0),
+        fill("NQ", "Sell", 2, 102.0, 2, fee=1.0),
+    ]))
+    assert len(trades) == 1
+    assert trades[0].fees == pytest.approx(6.0)
+    assert trades[0].exit_price == pytest.approx(101.5)
+
+
+def test_symbols_are_matched_independently():
+    trades = list(match_fills([
+        fill("AAPL", "Buy", 1, 10.0, 0),
+        fill("MSFT", "Sell", 1, 20.0, 1),
+        fill("AAPL", "Sell", 1, 11.0, 2),
+        fill("MSFT", "Buy", 1, 19.0, 3),
+    ]))
+    assert [(t.symbol, t.direction) for t in trades] == [
+        ("AAPL", "Long"), ("MSFT", "Short")
+    ]
+
+
+def test_open_position_yields_nothing():
+    assert list(match_fills([fill("AAPL", "Buy", 1, 10.0, 0)])) == []
+
+
+@pytest.mark.parametrize(
+    "bad_fill, expected_error",
+    [
+        ({"side": "Hold"}, "Unknown fill side"),
+        ({"quantity": 0}, "Fill quantity must be a positive number."),
+        ({"price": -1}, "Fill price must be a positive number."),
+        ({"timestamp": ""}, "Invalid fill timestamp"),
+    ],
+)
+def test_invalid_fills(bad_fill, expected_error):
+    f = fill("AAPL", "Buy", 1, 10.0, 0)
+    f.update(bad_fill)
+    with pytest.raises(ValueError) as excinfo:
+        list(match_fills([f]))
+    assert expected_error in str(excinfo.value)
+
+
+def test_out_of_order_fills_raise():
+    with pytest.raises(ValueError) as excinfo:
+        list(match_fills([
+            fill("AAPL", "Buy", 1, 10.0, 5),
+            fill("AAPL", "Sell", 1, 11.0, 0),
+        ]))
+    assert "not in chronological order" in str(excinfo.value)
+
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        list(match_fills([], method="HIFO"))
+
+
+def test_iter_fills_csv():
+    data = io.StringIO(
+        "Symbol,Side,Quantity,Price,Fee,Timestamp\n"
+        "AAPL,BUY,10,100,0.5,2024-01-02T14:30:00\n"
+        "AAPL,SELL,10,101,0.5,2024-01-02T15:00:00\n"
+    )
+    trades = list(match_fills(iter_fills_csv(data)))
+    assert len(trades) == 1
+    assert trades[0].pnl == pytest.approx(10.0)
+    assert trades[0].entry_timestamp.tzinfo is not None
+
+
+def test_round_trip_id_is_deterministic():
+    fills = [
+        fill("AAPL", "Buy", 10, 150.0, 0),
+        fill("AAPL", "Sell", 10, 155.0, 5),
+        fill("AAPL", "Buy", 10, 150.0, 10),
+        fill("AAPL", "Sell", 10, 155.0, 15),
+    ]
+    first = [round_trip_id(t) for t in match_fills(fills)]
+    again = [round_trip_id(t) for t in match_fills(fills)]
+    assert first == again
+    assert len(set(first)) == 2
+    assert all(len(doc_id) == 20 for doc_id in first)
+    assert round_trip_id(next(match_fills(fills)), "LIFO") != first[0]
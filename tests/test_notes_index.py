@@ -0,0 +1,149 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from core.notes_index import (
+    NotesIndex,
+    extract_tags,
+    get_notes_index,
+    parse_query,
+    tokenize
+)
+from core.trade import entries_to_arrow
+
+
+@pytest.fixture
+def index():
+    index = NotesIndex()
+    index.sync([
+        {"id": "t1", "symbol": "TSLA", "notes": "Chased the open, pure #FOMO"},
+        {"id": "t2", "symbol": "TSLA", "notes": "Clean #breakout over VWAP"},
+        {"id": "t3", "symbol": "AAPL", "notes": "#fomo after earnings gap"},
+        {"id": "t4", "symbol": "aapl", "notes": ""},
+    ])
+    return index
+
+
+def test_extract_tags():
+    assert extract_tags("Took the #Breakout, felt #fomo-ish. #1") == {
+        "breakout", "fomo-ish", "1"
+    }
+    assert extract_tags(None) == set()
+
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("Chased the open on #FOMO") == {"chased", "open", "fomo"}
+
+
+def test_parse_query():
+    assert parse_query("#fomo on TSLA") == ({"fomo"}, {"TSLA"}, set())
+    assert parse_query("symbol:msft $nvda gap") == (
+        set(), {"MSFT", "NVDA"}, {"gap"}
+    )
+    assert parse_query("VWAP $VWAP TSLA", known_symbols={"TSLA"}) == (
+        set(), {"VWAP", "TSLA"}, {"vwap"}
+    )
+
+
+def test_search_tags_and_symbols(index):
+    assert index.search("#fomo") == {"t1", "t3"}
+    assert index.search("#fomo on TSLA") == {"t1"}
+    assert index.search("$aapl") == {"t3", "t4"}
+    assert index.search("breakout") == {"t2"}
+    assert index.search("#fomo earnings") == {"t3"}
+    assert index.search("#revenge") == set()
+    # Capitalised words that are not indexed symbols match the notes
+    assert index.search("VWAP") == {"t2"}
+    assert index.search("FOMO TSLA") == {"t1"}
+    assert index.search("") == set()
+
+
+def test_sync_is_incremental(index):
+    assert len(index) == 4
+    assert index.sync([{"id": "t1", "notes": "#changed"}]) == 0
+    assert index.search("#changed") == set()
+    assert index.sync([{"id": "t5", "symbol": "TSLA", "notes": "#fomo"}]) == 1
+    assert index.search("#fomo TSLA") == {"t1", "t5"}
+
+
+def test_sync_table(index):
+    table, _ = entries_to_arrow([
+        {"id": "t1", "symbol": "TSLA", "direction": "Long", "entry_price": 1.0,
+         "exit_price": 2.0, "size": 1.0, "notes": "#changed"},
+        {"id": "t9", "symbol": "msft", "direction": "Short", "entry_price": 2.0,
+         "exit_price": 1.0, "size": 1.0, "notes": "Faded the #gap"},
+    ])
+    assert index.sync_table(table) == 1
+    assert index.search("#gap MSFT") == {"t9"}
+    assert index.search("#changed") == set()
+    assert index.sync_table(table) == 0
+
+
+def test_tag_counts(index):
+    assert index.tag_counts() == {"fomo": 2, "breakout": 1}
+
+
+def test_save_and_load(index, tmp_path):
+    path = str(tmp_path / "index" / "notes_index.json")
+    index.save(path)
+    loaded = NotesIndex.load(path)
+    assert len(loaded) == 4
+    assert loaded.search("#fomo on TSLA") == {"t1"}
+    assert len(NotesIndex.load(str(tmp_path / "missing.json"))) == 0
+
+
+def test_save_appends_only_new_entries(index, tmp_path):
+    path = str(tmp_path / "notes_index.json")
+    index.save(path)
+    index.add("t5", {"symbol": "NVDA", "notes": "#news gap"})
+    index.save(path)
+    index.save(path)
+    with open(path + ".log", encoding="utf-8") as f:
+        assert [line.count('"id"') for line in f] == [1] * 5
+    assert NotesIndex.load(path).search("#news NVDA") == {"t5"}
+
+
+def test_compaction_merges_other_writers(index, tmp_path):
+    path = str(tmp_path / "notes_index.json")
+    other = NotesIndex()
+    other.add("o1", {"symbol": "MSFT", "notes": "#gap fill"})
+    other.save(path)
+    with patch("core.notes_index.COMPACT_AFTER", 4):
+        index.save(path)
+    # The log was folded into the index file, keeping the other writer's entry
+    with open(path + ".log", encoding="utf-8") as f:
+        assert f.read() == ""
+    loaded = NotesIndex.load(path)
+    assert len(loaded) == 5
+    assert loaded.search("#gap MSFT") == {"o1"}
+    assert loaded.search("#fomo on TSLA") == {"t1"}
+
+
+def test_get_notes_index_is_shared(tmp_path):
+    path = str(tmp_path / "notes_index.json")
+    index = get_notes_index(path)
+    try:
+        assert get_notes_index(path) is index
+        threads = [threading.Thread(target=index.sync, args=([
+            {"id": f"t{n}-{i}", "symbol": "TSLA", "notes": "#fomo"}
+            for i in range(500)],)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(index.search("#fomo")) == 2000
+    finally:
+        get_notes_index.clear()
+
+
+def test_search_on_large_index():
+    index = NotesIndex()
+    symbols = ["TSLA", "AAPL", "MSFT", "NVDA"]
+    tags = ["#fomo", "#breakout", "#revenge", "#pullback", "#news"]
+    for i in range(50_000):
+        index.add(f"t{i}", {
+            "symbol": symbols[i % len(symbols)],
+            "notes": f"{tags[i % len(tags)]} setup number {i}",
+        })
+    assert len(index.search("#fomo on TSLA")) == 2_500
+    assert index.search("#fomo number 40") == {"t40"}
@@ -1,5 +1,8 @@
+import math
+
+import numpy as np
 import pytest
-from core.position_sizer import calculate_position_size
+from core.position_sizer import calculate_position_size, calculate_position_sizes
 
 
 # Test cases for valid long trade calculation
@@ -158,3 +161,48 @@ def test_edge_case_zero_risk_per_unit():
             is_long_trade=False,
         )
     assert "Risk per unit cannot be zero or negative." in str(excinfo.value)
+
+
+# Test cases for the vectorized batch calculation
+def test_batch_matches_scalar_calculation():
+    result = calculate_position_sizes(
+        account_balance=[10000, 50000, 10000, 20000],
+        risk_percentage=[1, 0.5, 1, 2],
+        entry_price=[100, 50, 100, 200],
+        stop_loss_price=[99, 49.5, 101, 202],
+        is_long_trade=[True, True, False, False],
+    )
+    assert result["position_size_units"].tolist() == [100, 500, 100, 200]
+    assert result["risk_amount_dollars"].tolist() == [100, 250, 100, 400]
+    assert result["risk_per_unit"].tolist() == [1, 0.5, 1, 2]
+    assert result["error"].tolist() == [None] * 4
+
+
+def test_batch_broadcasts_scalars():
+    result = calculate_position_sizes(10000, 1, np.array([100.0, 50.0]),
+                                      np.array([99.0, 49.0]), True)
+    assert result["position_size_units"].tolist() == [100, 100]
+
+
+def test_batch_reports_same_errors_as_scalar():
+    cases = [
+        (0, 1, 100, 99, True),
+        (10000, 101, 100, 99, True),
+        (10000, 1, -100, 99, True),
+        (10000, 1, 100, 0, True),
+        (10000, 1, 100, 101, True),
+        (10000, 1, 100, 99, False),
+        (10000, 1, 100, 100, True),
+        (10000, 1, 100, 100, False),
+    ]
+    result = calculate_position_sizes(*(list(column) for column in zip(*cases)))
+    for i, case in enumerate(cases):
+        with pytest.raises(ValueError) as excinfo:
+            calculate_position_size(*case)
+        assert result["error"][i] == str(excinfo.value)
+        assert math.isnan(result["position_size_units"][i])
+
+
+def test_batch_rejects_nan_inputs():
+    result = calculate_position_sizes([math.nan], [1], [100], [99], [True])
+    assert result["error"][0] == "Account balance must be a positive number."
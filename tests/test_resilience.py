@@ -0,0 +1,276 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from core.firestore_utils import (
+    READ_DEADLINE,
+    add_trade_entry,
+    clear_entries_cache,
+    create_account,
+    get_trade_entries,
+    get_trade_table,
+    iter_trade_entries
+)
+from core.migrate_accounts import migrate_entries
+from core.resilience import (
+    FIRESTORE_BREAKER,
+    CircuitBreaker,
+    CircuitOpenError,
+    call_with_resilience,
+    get_metrics,
+    reset_metrics
+)
+from tests.fake_firestore import FakeFirestore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    # The breaker, metrics and entries cache are shared by the whole process
+    FIRESTORE_BREAKER.reset()
+    reset_metrics()
+    clear_entries_cache()
+    yield
+    FIRESTORE_BREAKER.reset()
+    reset_metrics()
+    clear_entries_cache()
+
+
+@pytest.fixture
+def st():
+    with patch("core.firestore_utils.st") as mock_st:
+        yield mock_st
+
+
+@pytest.fixture
+def db(st):
+    return FakeFirestore()
+
+
+def no_backoff():
+    return patch("core.resilience.random.uniform", return_value=0.0)
+
+
+def unavailable():
+    return api_exceptions.ServiceUnavailable("backend down")
+
+
+def flaky(errors, result="ok"):
+    errors = list(errors)
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        if errors:
+            raise errors.pop(0)
+        return result
+    fn.calls = calls
+    return fn
+
+
+def test_retries_transient_errors():
+    clock = FakeClock()
+    fn = flaky([unavailable(), api_exceptions.DeadlineExceeded("slow")])
+    result = call_with_resilience(fn, breaker=CircuitBreaker(), clock=clock,
+                                  sleep=clock.sleep)
+    assert result == "ok"
+    assert len(fn.calls) == 3
+    metrics = get_metrics()
+    assert metrics["retries"] == 2
+    assert metrics["deadline_exceeded"] == 1
+
+
+def test_does_not_retry_other_errors():
+    fn = flaky([api_exceptions.PermissionDenied("no")])
+    breaker = CircuitBreaker(failure_threshold=1)
+    with pytest.raises(api_exceptions.PermissionDenied):
+        call_with_resilience(fn, breaker=breaker, sleep=lambda s: None)
+    assert len(fn.calls) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_gives_up_after_max_attempts():
+    clock = FakeClock()
+    fn = flaky([unavailable()] * 5)
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        call_with_resilience(fn, max_attempts=3, breaker=CircuitBreaker(),
+                             clock=clock, sleep=clock.sleep)
+    assert len(fn.calls) == 3
+    assert get_metrics()["failures"] == 1
+
+
+def test_deadline_bounds_retries_and_timeouts():
+    clock = FakeClock()
+    fn = flaky([unavailable()] * 100)
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        call_with_resilience(fn, deadline=1.0, max_attempts=100, base_delay=0.2,
+                             max_delay=0.2,
+                             breaker=CircuitBreaker(failure_threshold=100),
+                             clock=clock, sleep=clock.sleep)
+    assert clock.now < 1.0
+    # Each attempt only gets the time that is left
+    assert fn.calls == sorted(fn.calls, reverse=True)
+    assert fn.calls[0] == 1.0
+
+
+def test_breaker_opens_then_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0,
+                             clock=clock)
+    for _ in range(2):
+        with pytest.raises(api_exceptions.ServiceUnavailable):
+            call_with_resilience(flaky([unavailable()]), max_attempts=1,
+                                 breaker=breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    fn = flaky([])
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(fn, breaker=breaker)
+    assert fn.calls == []
+    assert get_metrics()["short_circuits"] == 1
+
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial call while half-open
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20.0
+    assert call_with_resilience(fn, breaker=breaker) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_add_trade_entry_retry_does_not_duplicate(db):
+    db.fail_next(unavailable())
+    with no_backoff():
+        doc_id = add_trade_entry(db, {"symbol": "AAPL", "pnl": 1.0})
+    assert doc_id is not None
+    assert db.document_count("journal_entries") == 1
+    assert db.calls["add"] == 2
+
+
+def test_add_trade_entry_when_breaker_open(db, st):
+    for _ in range(FIRESTORE_BREAKER.failure_threshold):
+        FIRESTORE_BREAKER.record_failure()
+    assert add_trade_entry(db, {"symbol": "AAPL", "pnl": 1.0}) is None
+    assert db.calls["add"] == 0
+    st.error.assert_called_once()
+
+
+def test_get_trade_entries_serves_cache_when_unhealthy(db, st):
+    add_trade_entry(db, {"symbol": "AAPL", "pnl": 1.0})
+    assert len(get_trade_entries(db)) == 1
+
+    db.fail_next(unavailable(), times=100)
+    with no_backoff():
+        for _ in range(FIRESTORE_BREAKER.failure_threshold):
+            assert [e["symbol"] for e in get_trade_entries(db)] == ["AAPL"]
+    assert FIRESTORE_BREAKER.state == CircuitBreaker.OPEN
+
+    # Open breaker: served from the cache without touching the backend
+    db.calls.clear()
+    assert [e["symbol"] for e in get_trade_entries(db)] == ["AAPL"]
+    assert db.calls["stream"] == 0
+    assert get_metrics()["cache_hits"] == FIRESTORE_BREAKER.failure_threshold + 1
+    st.warning.assert_called()
+    st.error.assert_not_called()
+
+
+def test_get_trade_table_serves_cache_when_unhealthy(db, st):
+    add_trade_entry(db, {"symbol": "AAPL", "direction": "Long",
+                         "entry_price": 1.0, "exit_price": 2.0, "size": 1.0})
+    table, _ = get_trade_table(db)
+    assert table.num_rows == 1
+
+    db.fail_next(unavailable(), times=3)  # Every attempt of one read
+    with no_backoff():
+        cached, _ = get_trade_table(db)
+    assert cached.equals(table)
+    st.warning.assert_called_once()
+
+    db.fail_next(api_exceptions.PermissionDenied("no"))
+    empty, skipped = get_trade_table(db)
+    assert empty.num_rows == 0 and skipped == 0
+    st.error.assert_called_once()
+
+
+def test_get_trade_entries_does_not_hide_other_errors(db, st):
+    add_trade_entry(db, {"symbol": "AAPL", "pnl": 1.0})
+    assert len(get_trade_entries(db)) == 1
+
+    db.fail_next(api_exceptions.PermissionDenied("no"))
+    assert get_trade_entries(db) == []
+    st.error.assert_called_once()
+    st.warning.assert_not_called()
+    assert get_metrics().get("cache_hits", 0) == 0
+
+
+def test_get_trade_entries_without_cache_reports_error(db, st):
+    db.fail_next(api_exceptions.PermissionDenied("no"))
+    assert get_trade_entries(db) == []
+    st.error.assert_called_once()
+
+
+def test_slow_backend_latency_is_bounded(db):
+    add_trade_entry(db, {"symbol": "AAPL", "pnl": 1.0})
+    get_trade_entries(db)
+    db.latency = 5.0
+    started = time.monotonic()
+    with patch("core.firestore_utils.READ_DEADLINE", 0.3):
+        assert len(get_trade_entries(db)) == 1  # From the cache
+    assert time.monotonic() - started < 1.0
+
+
+def test_paged_reads_retry(db):
+    for i in range(3):
+        add_trade_entry(db, {"symbol": f"S{i}", "pnl": 1.0})
+    db.fail_next(unavailable())
+    with no_backoff():
+        entries = list(iter_trade_entries(db, page_size=2))
+    assert len(entries) == 3
+
+
+def test_get_trade_entries_applies_the_deadline_per_page(db):
+    for i in range(5):
+        add_trade_entry(db, {"symbol": f"S{i}", "pnl": 1.0})
+    db.calls.clear()
+    # One query, and so one deadline, per page rather than per journal
+    with patch("core.firestore_utils.TABLE_PAGE_SIZE", 2), \
+            patch("core.firestore_utils.call_with_resilience",
+                  wraps=call_with_resilience) as call:
+        assert len(get_trade_entries(db)) == 5
+        assert [e["symbol"] for e in get_trade_entries(db, limit=3)] == [
+            "S4", "S3", "S2"]
+    assert db.calls["stream"] == 5
+    assert call.call_count == 5
+    assert all(c.kwargs["deadline"] == READ_DEADLINE for c in call.call_args_list)
+
+
+def test_account_writes_and_migration_retry(db):
+    db.fail_next(unavailable())
+    with no_backoff():
+        create_account(db, "swing")
+    assert db.calls["set"] == 2
+
+    for i in range(3):
+        add_trade_entry(db, {"symbol": f"S{i}", "pnl": 1.0})
+    db.fail_next(unavailable(), times=2)
+    with no_backoff():
+        assert migrate_entries(db, account_id="swing", delete=True,
+                               batch_size=2) == {"swing": 3}
+    assert db.document_count("accounts/swing/journal_entries") == 3
+    assert db.document_count("journal_entries") == 0
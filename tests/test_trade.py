@@ -0,0 +1,163 @@
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from core.trade import (
+    TRADE_ARROW_SCHEMA,
+    Trade,
+    compute_pnl,
+    entries_to_arrow,
+    entry_columns,
+    trades_from_entries,
+    trades_to_arrow,
+    trades_to_records
+)
+
+ENTRY_TS = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+EXIT_TS = datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc)
+
+
+def make_trade(**overrides):
+    fields = dict(symbol="aapl", direction="Long", entry_price=150.0,
+                  exit_price=155.0, size=10.0, entry_timestamp=ENTRY_TS,
+                  exit_timestamp=EXIT_TS, notes="#breakout")
+    fields.update(overrides)
+    return Trade(**fields)
+
+
+def test_compute_pnl():
+    assert compute_pnl(True, 100.0, 110.0, 2.0) == 20.0
+    assert compute_pnl(False, 100.0, 110.0, 2.0) == -20.0
+
+
+def test_trade_pnl_and_normalization():
+    trade = make_trade(fees=1.5)
+    assert trade.symbol == "AAPL"
+    assert trade.pnl == 50.0
+    assert trade.net_pnl == 48.5
+    assert make_trade(direction="Short").pnl == -50.0
+
+
+def test_trade_uses_slots():
+    trade = make_trade()
+    assert not hasattr(trade, "__dict__")
+    with pytest.raises(AttributeError):
+        trade.unknown_field = 1
+
+
+@pytest.mark.parametrize(
+    "overrides, expected_error",
+    [
+        ({"symbol": " "}, "Symbol is required."),
+        ({"direction": "Sideways"}, "Direction must be 'Long' or 'Short'."),
+        ({"entry_price": 0}, "must be greater than zero."),
+        ({"exit_price": -1.0}, "must be greater than zero."),
+        ({"size": 0}, "must be greater than zero."),
+        ({"size": None}, "must be greater than zero."),
+        ({"size": float("nan")}, "must be greater than zero."),
+        ({"entry_price": float("inf")}, "must be greater than zero."),
+        ({"size": True}, "must be greater than zero."),
+        ({"exit_price": "155"}, "must be greater than zero."),
+        ({"fees": -1.0}, "Fees cannot be negative."),
+        ({"fees": float("nan")}, "Fees cannot be negative."),
+        ({"symbol": 123}, "Symbol is required."),
+        ({"entry_timestamp": "2024-01-02"}, "must be dates and times."),
+        ({"notes": 5}, "Notes must be text."),
+        ({"exit_timestamp": datetime(2024, 1, 2, 14, 0, tzinfo=timezone.utc)},
+         "Exit Timestamp must be after Entry Timestamp."),
+    ],
+)
+def test_trade_validation(overrides, expected_error):
+    with pytest.raises(ValueError) as excinfo:
+        make_trade(**overrides)
+    assert expected_error in str(excinfo.value)
+
+
+def test_dict_round_trip():
+    entry = make_trade().to_dict()
+    assert entry["pnl"] == 50.0
+    assert "fees" not in entry
+    assert "id" not in entry
+    entry.update({"id": "doc1", "pnl": 999.0})
+    trade = Trade.from_dict(entry)
+    assert trade.id == "doc1"
+    assert trade.pnl == 50.0
+
+
+def test_trades_from_entries_skips_invalid():
+    trades, skipped = trades_from_entries([
+        make_trade().to_dict(),
+        {"symbol": "MSFT"},
+    ])
+    assert len(trades) == 1
+    assert skipped == 1
+
+
+def test_trades_to_records():
+    records = trades_to_records([make_trade(), make_trade(direction="Short")])
+    assert records.dtype.names[0] == "symbol"
+    assert records["pnl"].tolist() == [50.0, -50.0]
+    assert records["is_long"].tolist() == [True, False]
+    assert records["entry_timestamp"][0] == np.datetime64("2024-01-02T14:30")
+
+
+def test_trades_to_arrow():
+    table = trades_to_arrow([make_trade(id="a"), make_trade(id="b", fees=1.0)])
+    assert table.num_rows == 2
+    assert table.column("pnl").to_pylist() == [50.0, 50.0]
+    df = table.to_pandas()
+    assert df["id"].tolist() == ["a", "b"]
+    assert df["entry_timestamp"].dt.strftime("%H:%M").tolist() == ["14:30"] * 2
+
+
+def test_entries_to_arrow_matches_trade_validation():
+    valid = dict(make_trade(fees=1.5).to_dict(), id="a")
+    entries = [
+        valid,
+        dict(make_trade(direction="Short").to_dict(), id="b", symbol=" msft "),
+        {**valid, "id": "c", "pnl": 999.0, "fees": None, "notes": None},
+        {"id": "d", "symbol": "MSFT"},
+        {**valid, "symbol": "  "},
+        {**valid, "symbol": 7},
+        {**valid, "direction": "Buy"},
+        {**valid, "direction": None},
+        {**valid, "entry_price": "150"},
+        {**valid, "entry_price": float("nan")},
+        {**valid, "exit_price": float("inf")},
+        {**valid, "size": 0},
+        {**valid, "size": True},
+        {**valid, "fees": -1.0},
+        {**valid, "exit_timestamp": ENTRY_TS.replace(hour=10)},
+        {**valid, "entry_timestamp": "2024-01-02"},
+        {**valid, "notes": 5},
+    ]
+    table, skipped = entries_to_arrow(entries)
+    trades, expected_skipped = trades_from_entries(entries)
+    assert skipped == expected_skipped == 14
+    assert table.schema == TRADE_ARROW_SCHEMA
+    assert table.to_pylist() == trades_to_arrow(trades).to_pylist()
+    # P&L is recomputed rather than read from the entry
+    assert table.column("pnl").to_pylist() == [50.0, -50.0, 50.0]
+    assert table.column("symbol").to_pylist() == ["AAPL", "MSFT", "AAPL"]
+
+
+def test_entries_to_arrow_from_columns():
+    entries = [dict(make_trade().to_dict(), id=f"t{i}") for i in range(5)]
+    columns = entry_columns(entries[:2])
+    entry_columns(entries[2:], columns)
+    table, skipped = entries_to_arrow(columns=columns)
+    assert skipped == 0
+    assert table.column("id").to_pylist() == [f"t{i}" for i in range(5)]
+
+    table, skipped = entries_to_arrow([])
+    assert table.num_rows == 0 and skipped == 0
+    assert table.schema == TRADE_ARROW_SCHEMA
+
+
+def test_bulk_forms_are_smaller_than_dicts():
+    trades = [make_trade(id=f"t{i}") for i in range(1_000)]
+    dict_bytes = sum(sys.getsizeof(t.to_dict()) for t in trades)
+    slot_bytes = sum(sys.getsizeof(t) for t in trades)
+    assert slot_bytes < dict_bytes
+    assert trades_to_records(trades).nbytes < dict_bytes